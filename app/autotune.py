@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# autotune.py
+
+import argparse
+import itertools
+import json
+import logging
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import psutil
+import torch
+import yaml
+
+from benchmark_utils import BenchmarkUtils, collect_environment, get_cpu_model
+
+logger = logging.getLogger('YOLOv8-Autotune')
+
+DEFAULT_PROFILE_DIR = '/workspace/configs/tuned'
+
+
+def host_profile_key():
+    """Key identifying this host class: CPU model plus physical core count"""
+    cores = psutil.cpu_count(logical=False) or psutil.cpu_count()
+    cpu = re.sub(r'[^a-z0-9]+', '-', get_cpu_model().lower()).strip('-') or 'unknown-cpu'
+    return f'{cpu}_{cores}c'
+
+
+def load_tuned_profile(profile_dir=DEFAULT_PROFILE_DIR):
+    """Return the tuned profile for this host, or None if it was never tuned"""
+    path = Path(profile_dir) / f'{host_profile_key()}.yaml'
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r') as f:
+            return yaml.safe_load(f).get('profile')
+    except Exception as e:
+        logger.error(f"Error loading tuned profile {path}: {e}")
+        return None
+
+
+def apply_thread_settings(profile):
+    """Apply the torch thread counts of a tuned profile"""
+    if profile.get('intra_op_threads'):
+        torch.set_num_threads(profile['intra_op_threads'])
+    # Skipped when already applied, e.g. by an earlier detector in this process
+    if profile.get('inter_op_threads') and torch.get_num_interop_threads() != profile['inter_op_threads']:
+        try:
+            torch.set_num_interop_threads(profile['inter_op_threads'])
+        except RuntimeError as e:
+            # Only settable before the first parallel region runs
+            logger.warning(f"Could not set inter-op threads: {e}")
+
+
+def _default_thread_counts():
+    max_threads = psutil.cpu_count(logical=True) or 1
+    return sorted({1, 2, 4, 8, 16, 32, max_threads} & set(range(1, max_threads + 1)))
+
+
+def evaluate_candidates(model_path, devices, thread_counts, batch_sizes, input_sizes, iterations):
+    """Benchmark every candidate at the current inter-op thread setting"""
+    from ultralytics import YOLO
+
+    model = YOLO(model_path).model
+    measurements = []
+    for device in devices:
+        benchmark = BenchmarkUtils(save_dir='/tmp/autotune', device=device)
+        counts = thread_counts if device == 'cpu' else [torch.get_num_threads()]
+        for num_threads, input_size in itertools.product(counts, input_sizes):
+            torch.set_num_threads(num_threads)
+            results = benchmark.benchmark_inference(
+                model, tuple(input_size), batch_sizes=batch_sizes, iterations=iterations
+            )
+            for batch_size, stats in results.items():
+                measurements.append({
+                    'device': device,
+                    'intra_op_threads': num_threads,
+                    'inter_op_threads': torch.get_num_interop_threads(),
+                    'batch_size': batch_size,
+                    'input_size': list(input_size),
+                    'p95_ms': stats['p95_time'] * 1000,
+                    'fps': stats['fps']
+                })
+    return measurements
+
+
+def _evaluate_in_subprocess(inter_op_threads, args):
+    """Inter-op threads can only be set once per process, so each value runs in a child"""
+    command = [
+        sys.executable, __file__, '--worker',
+        '--inter-op-threads', str(inter_op_threads),
+        '--model', args.model,
+        '--iterations', str(args.iterations),
+        '--devices', *args.devices,
+        '--threads', *map(str, args.threads),
+        '--batch-sizes', *map(str, args.batch_sizes),
+        '--input-sizes', *map(str, args.input_sizes),
+    ]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def select_profile(measurements, latency_budget_ms):
+    """Pick the largest input size meeting the latency budget, then the highest FPS.
+
+    Frames in a batch wait for the whole batch, so the budget applies to the
+    batch latency. Falls back to the lowest-latency candidate if none fit.
+    """
+    feasible = [m for m in measurements if m['p95_ms'] <= latency_budget_ms]
+    if not feasible:
+        logger.warning(f"No configuration meets {latency_budget_ms}ms, using the fastest")
+        return min(measurements, key=lambda m: m['p95_ms'])
+    return max(feasible, key=lambda m: (m['input_size'][0] * m['input_size'][1], m['fps']))
+
+
+def save_profile(best, measurements, latency_budget_ms, profile_dir=DEFAULT_PROFILE_DIR):
+    """Write the tuned profile for this host"""
+    profile_dir = Path(profile_dir)
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    path = profile_dir / f'{host_profile_key()}.yaml'
+    document = {
+        'host_key': host_profile_key(),
+        'created': time.strftime('%Y%m%d_%H%M%S'),
+        'latency_budget_ms': latency_budget_ms,
+        'environment': collect_environment(),
+        'profile': {
+            key: best[key] for key in
+            ('device', 'intra_op_threads', 'inter_op_threads', 'batch_size', 'input_size')
+        },
+        'measurements': measurements
+    }
+    with open(path, 'w') as f:
+        yaml.safe_dump(document, f, sort_keys=False)
+    logger.info(f"Tuned profile written to {path}")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Autotune threads, batch size and input size for this host')
+    parser.add_argument('--model', default='/workspace/models/yolov8n.pt', help='Model path')
+    parser.add_argument('--latency-budget', type=float, default=66.0,
+                        help='p95 batch latency budget in ms')
+    parser.add_argument('--devices', nargs='+',
+                        default=['cpu'] + (['cuda'] if torch.cuda.is_available() else []),
+                        help='Backends to try')
+    parser.add_argument('--threads', type=int, nargs='+', default=_default_thread_counts(),
+                        help='Intra-op thread counts to try')
+    parser.add_argument('--inter-op', type=int, nargs='+', default=[1, 2],
+                        help='Inter-op thread counts to try')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 2, 4], help='Batch sizes to try')
+    parser.add_argument('--input-sizes', type=int, nargs='+', default=[320, 480, 640],
+                        help='Square input sizes to try')
+    parser.add_argument('--iterations', type=int, default=30, help='Timed iterations per candidate')
+    parser.add_argument('--profile-dir', default=DEFAULT_PROFILE_DIR, help='Tuned profile directory')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--inter-op-threads', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    input_sizes = [(size, size) for size in args.input_sizes]
+
+    if args.worker:
+        torch.set_num_interop_threads(args.inter_op_threads)
+        measurements = evaluate_candidates(
+            args.model, args.devices, args.threads, args.batch_sizes, input_sizes, args.iterations
+        )
+        print(json.dumps(measurements))
+        return
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    logger.info(f"Autotuning host {host_profile_key()}")
+
+    measurements = []
+    for inter_op_threads in args.inter_op:
+        logger.info(f"Evaluating candidates with {inter_op_threads} inter-op thread(s)")
+        measurements.extend(_evaluate_in_subprocess(inter_op_threads, args))
+
+    best = select_profile(measurements, args.latency_budget)
+    logger.info(
+        f"Selected {best['device']} threads={best['intra_op_threads']}/{best['inter_op_threads']} "
+        f"batch={best['batch_size']} input={best['input_size']}: "
+        f"{best['fps']:.1f} FPS, p95 {best['p95_ms']:.1f}ms"
+    )
+    save_profile(best, measurements, args.latency_budget, args.profile_dir)
+
+
+if __name__ == '__main__':
+    main()
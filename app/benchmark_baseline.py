@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# benchmark_baseline.py
+
+import argparse
+import hashlib
+import json
+import logging
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger('YOLOv8-Baseline')
+
+STATISTICS = {
+    'mean': lambda samples: samples.mean(axis=-1),
+    'p50': lambda samples: np.percentile(samples, 50, axis=-1),
+    'p95': lambda samples: np.percentile(samples, 95, axis=-1),
+}
+
+
+def extract_series(results):
+    """Map each measured configuration of a results file to its latency samples (ms).
+
+    Keys look like ``<model>/<input size>/bs<batch>/<backend>`` for
+    ``BenchmarkUtils.run_comprehensive_benchmark`` output and
+    ``<model>/pipeline/s<streams>w<workers>/<backend>`` for pipeline runs,
+    suffixed with ``/tuned-<hash>`` when a tuned profile was applied so runs
+    with different settings never share a baseline.
+    """
+    model = results.get('model_info', {}).get('name', 'model')
+    backend = results.get('environment', {}).get('device') \
+        or results.get('model_info', {}).get('device', 'unknown')
+    series = {}
+    profile = results.get('tuned_profile')
+    profile_tag = ''
+    if profile:
+        digest = hashlib.sha1(json.dumps(profile, sort_keys=True).encode('utf-8')).hexdigest()
+        profile_tag = f'/tuned-{digest[:8]}'
+
+    for size, benchmarks in results.get('benchmarks', {}).items():
+        for batch_size, stats in benchmarks.get('inference', {}).items():
+            if stats.get('times'):
+                series[f'{model}/{size}/bs{batch_size}/{backend}'] = [t * 1000 for t in stats['times']]
+
+    for run in results.get('runs', []):
+        if run.get('latency_samples_ms'):
+            key = f"{model}/pipeline/s{run['streams']}w{run['workers']}/{backend}{profile_tag}"
+            series[key] = run['latency_samples_ms']
+
+    return series
+
+
+def bootstrap_relative_change(baseline, candidate, statistic='p95', n_resamples=2000,
+                              confidence=0.95, seed=0):
+    """Bootstrap confidence interval of ``stat(candidate) / stat(baseline) - 1``"""
+    rng = np.random.default_rng(seed)
+    baseline = np.asarray(baseline, dtype=np.float64)
+    candidate = np.asarray(candidate, dtype=np.float64)
+    stat = STATISTICS[statistic]
+
+    baseline_stats = stat(baseline[rng.integers(0, len(baseline), (n_resamples, len(baseline)))])
+    candidate_stats = stat(candidate[rng.integers(0, len(candidate), (n_resamples, len(candidate)))])
+    changes = candidate_stats / baseline_stats - 1.0
+
+    alpha = (1.0 - confidence) / 2.0
+    low, high = np.percentile(changes, [100 * alpha, 100 * (1 - alpha)])
+    return {
+        'baseline': float(stat(baseline)),
+        'candidate': float(stat(candidate)),
+        'change': float(stat(candidate) / stat(baseline) - 1.0),
+        'ci_low': float(low),
+        'ci_high': float(high)
+    }
+
+
+class BaselineStore:
+    def __init__(self, root='/workspace/results/benchmarks/baselines'):
+        """Named benchmark baselines, one file per measured configuration"""
+        self.root = Path(root)
+
+    @staticmethod
+    def _filename(key):
+        return re.sub(r'[^A-Za-z0-9_.-]+', '_', key) + '.json'
+
+    def save(self, name, results, source=None):
+        """Store every series of ``results`` under baseline ``name``"""
+        directory = self.root / name
+        directory.mkdir(parents=True, exist_ok=True)
+        series = extract_series(results)
+        for key, samples in series.items():
+            with open(directory / self._filename(key), 'w') as f:
+                json.dump({
+                    'key': key,
+                    'samples_ms': samples,
+                    'environment': results.get('environment', {}),
+                    'source': str(source) if source else None,
+                    'created': time.strftime('%Y%m%d_%H%M%S')
+                }, f)
+        logger.info(f"Saved {len(series)} series to baseline '{name}'")
+        return list(series)
+
+    def load(self, name, key):
+        """Return the stored baseline entry for ``key`` or None"""
+        path = self.root / name / self._filename(key)
+        if not path.exists():
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+
+
+def compare(store, name, results, statistic='p95', threshold=0.05, confidence=0.95):
+    """Compare ``results`` against baseline ``name``.
+
+    A configuration regresses when the whole confidence interval of its
+    relative change lies above ``threshold``, so noisy runs are not flagged.
+    """
+    report = []
+    for key, samples in extract_series(results).items():
+        baseline = store.load(name, key)
+        if baseline is None:
+            report.append({'key': key, 'status': 'no-baseline'})
+            continue
+
+        result = bootstrap_relative_change(
+            baseline['samples_ms'], samples, statistic=statistic, confidence=confidence
+        )
+        if result['ci_low'] > threshold:
+            status = 'regression'
+        elif result['ci_high'] < -threshold:
+            status = 'improvement'
+        else:
+            status = 'ok'
+        report.append({'key': key, 'status': status, **result})
+    return report
+
+
+def _load_results(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark baselines and regression checks')
+    parser.add_argument('--store', default='/workspace/results/benchmarks/baselines',
+                        help='Baseline store directory')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    save_parser = subparsers.add_parser('save', help='Store a results file as a named baseline')
+    save_parser.add_argument('results', help='Benchmark results JSON')
+    save_parser.add_argument('--name', default='main', help='Baseline name')
+
+    compare_parser = subparsers.add_parser('compare', help='Compare a results file with a baseline')
+    compare_parser.add_argument('results', help='Benchmark results JSON')
+    compare_parser.add_argument('--name', default='main', help='Baseline name')
+    compare_parser.add_argument('--statistic', choices=sorted(STATISTICS), default='p95',
+                                help='Latency statistic to compare')
+    compare_parser.add_argument('--threshold', type=float, default=0.05,
+                                help='Relative slowdown tolerated before failing (0.05 = 5%%)')
+    compare_parser.add_argument('--confidence', type=float, default=0.95,
+                                help='Bootstrap confidence level')
+    compare_parser.add_argument('--allow-missing', action='store_true',
+                                help='Succeed even if no configuration has a baseline')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+
+    store = BaselineStore(args.store)
+    results = _load_results(args.results)
+
+    if args.command == 'save':
+        store.save(args.name, results, source=args.results)
+        return 0
+
+    report = compare(store, args.name, results, statistic=args.statistic,
+                     threshold=args.threshold, confidence=args.confidence)
+    for entry in report:
+        if entry['status'] == 'no-baseline':
+            logger.info(f"{entry['key']}: no baseline")
+            continue
+        logger.info(
+            f"{entry['key']}: {entry['status']} "
+            f"{args.statistic} {entry['baseline']:.2f}ms -> {entry['candidate']:.2f}ms "
+            f"({entry['change']:+.1%}, CI [{entry['ci_low']:+.1%}, {entry['ci_high']:+.1%}])"
+        )
+
+    regressions = [entry for entry in report if entry['status'] == 'regression']
+    if regressions:
+        logger.error(f"{len(regressions)} configuration(s) regressed beyond {args.threshold:.0%}")
+        return 1
+    # A mistyped name, renamed model or new backend must not pass silently
+    if all(entry['status'] == 'no-baseline' for entry in report) and not args.allow_missing:
+        logger.error(f"Nothing was compared against baseline '{args.name}'")
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
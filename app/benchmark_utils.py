@@ -1,8 +1,13 @@
 # benchmark_utils.py
 
 import time
+import os
+import platform
+import socket
+import threading
 import torch
 import numpy as np
+import psutil
 import json
 from pathlib import Path
 import logging
@@ -10,80 +15,226 @@ from contextlib import contextmanager
 
 logger = logging.getLogger('YOLOv8-Benchmark')
 
+MB = 1024 ** 2
+
+
+class Timer:
+    """Result of a ``BenchmarkUtils.timing()`` block"""
+
+    def __init__(self):
+        self.elapsed = None
+
+    def __float__(self):
+        return float(self.elapsed or 0.0)
+
+
+class PeakRssSampler:
+    def __init__(self, process, interval=0.001):
+        """Track the peak resident set size of ``process`` while the block runs.
+
+        ``ru_maxrss`` is a lifetime high-water mark, so a background thread
+        polls the current RSS instead to get a per-call peak.
+        """
+        self.process = process
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.process.memory_info().rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = self.process.memory_info().rss
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+        return False
+
+
+def get_cpu_model():
+    """Human readable CPU model name"""
+    try:
+        import cpuinfo
+        return cpuinfo.get_cpu_info().get('brand_raw') or platform.processor()
+    except Exception:
+        return platform.processor() or platform.machine()
+
+
+def collect_environment(device=None):
+    """Collect hardware and software metadata so runs from different hosts compare"""
+    device = torch.device(device or ('cuda' if torch.cuda.is_available() else 'cpu'))
+    env = {
+        'hostname': socket.gethostname(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'python': platform.python_version(),
+        'torch': torch.__version__,
+        'cpu_model': get_cpu_model(),
+        'cpu_cores_physical': psutil.cpu_count(logical=False),
+        'cpu_cores_logical': psutil.cpu_count(logical=True),
+        'memory_total_mb': psutil.virtual_memory().total / MB,
+        'torch_num_threads': torch.get_num_threads(),
+        'torch_num_interop_threads': torch.get_num_interop_threads(),
+        'device': device.type,
+        'cuda_available': torch.cuda.is_available()
+    }
+    if device.type == 'cuda':
+        props = torch.cuda.get_device_properties(device)
+        env.update({
+            'gpu_name': props.name,
+            'gpu_memory_total_mb': props.total_memory / MB,
+            'cuda_version': torch.version.cuda,
+            'cudnn_version': torch.backends.cudnn.version()
+        })
+    return env
+
+
+def get_model_name(model):
+    """Identify a model by its weights file, falling back to its config file or class"""
+    config = getattr(model, 'yaml', None)
+    path = getattr(model, 'pt_path', None) or (config.get('yaml_file') if isinstance(config, dict) else None)
+    return Path(path).stem if path else model.__class__.__name__
+
+
 class BenchmarkUtils:
-    def __init__(self, save_dir='/workspace/results/benchmarks'):
+    def __init__(self, save_dir='/workspace/results/benchmarks', device=None):
         self.save_dir = Path(save_dir)
         self.save_dir.mkdir(parents=True, exist_ok=True)
+        self.device = torch.device(device or ('cuda' if torch.cuda.is_available() else 'cpu'))
+        self.is_cuda = self.device.type == 'cuda'
+        self.process = psutil.Process()
         self.results = {
             'inference_times': [],
             'batch_processing_times': [],
             'memory_usage': [],
             'gpu_utilization': []
         }
+        logger.info(f"Benchmarking on device: {self.device}")
 
     @contextmanager
     def timing(self):
-        """Context manager for timing operations"""
+        """Context manager for timing operations
+
+        Yields a ``Timer`` whose ``elapsed`` (seconds) is set on exit, after
+        pending device work has finished.
+        """
+        timer = Timer()
+        self._synchronize()
         start = time.perf_counter()
-        yield
-        end = time.perf_counter()
-        return end - start
+        try:
+            yield timer
+        finally:
+            self._synchronize()
+            timer.elapsed = time.perf_counter() - start
+
+    def _synchronize(self):
+        """Wait for queued device work so timings are accurate"""
+        if self.is_cuda:
+            torch.cuda.synchronize(self.device)
+
+    def _reset_peak_memory(self):
+        if self.is_cuda:
+            torch.cuda.reset_peak_memory_stats(self.device)
+
+    def _memory_mb(self):
+        """Peak CUDA allocation on GPU, resident set size on CPU (MB)"""
+        if self.is_cuda:
+            return torch.cuda.max_memory_allocated(self.device) / MB
+        return self.process.memory_info().rss / MB
+
+    def _prepare(self, model, batch_size, input_size):
+        """Move the model to the benchmark device and build a matching input"""
+        model = model.to(self.device)
+        model.eval()
+        dummy_input = torch.randn(batch_size, 3, *input_size, device=self.device)
+        return model, dummy_input
 
     def benchmark_inference(self, model, input_size=(640, 640), batch_sizes=[1, 2, 4, 8], iterations=100):
         """Benchmark inference performance"""
         results = {}
-        
+
         for batch_size in batch_sizes:
             times = []
             memory_usage = []
-            
+
             # Create dummy input
-            dummy_input = torch.randn(batch_size, 3, *input_size).cuda()
-            
-            # Warmup
-            for _ in range(10):
-                _ = model(dummy_input)
-            
-            # Benchmark
-            torch.cuda.synchronize()
-            for _ in range(iterations):
-                torch.cuda.reset_peak_memory_stats()
-                
-                start = time.perf_counter()
-                _ = model(dummy_input)
-                torch.cuda.synchronize()
-                end = time.perf_counter()
-                
-                times.append(end - start)
-                memory_usage.append(torch.cuda.max_memory_allocated() / 1024**2)  # MB
-            
+            model, dummy_input = self._prepare(model, batch_size, input_size)
+
+            with torch.inference_mode():
+                # Warmup
+                for _ in range(10):
+                    _ = model(dummy_input)
+
+                # Benchmark
+                for _ in range(iterations):
+                    self._reset_peak_memory()
+
+                    with self.timing() as timer:
+                        _ = model(dummy_input)
+
+                    times.append(timer.elapsed)
+                    memory_usage.append(self._memory_mb())
+
             results[batch_size] = {
                 'mean_time': np.mean(times),
                 'std_time': np.std(times),
                 'min_time': np.min(times),
                 'max_time': np.max(times),
+                'p50_time': np.percentile(times, 50),
+                'p95_time': np.percentile(times, 95),
+                'p99_time': np.percentile(times, 99),
                 'mean_memory': np.mean(memory_usage),
-                'fps': batch_size / np.mean(times)
+                'fps': batch_size / np.mean(times),
+                'times': times
             }
-        
+
+        return results
+
+    def benchmark_threads(self, model, input_size=(640, 640), thread_counts=None, iterations=50):
+        """Benchmark batch-1 latency across torch intra-op thread counts (CPU)"""
+        if thread_counts is None:
+            max_threads = os.cpu_count() or 1
+            thread_counts = sorted({1, 2, 4, 8, 16, 32, max_threads} & set(range(1, max_threads + 1)))
+
+        original_threads = torch.get_num_threads()
+        results = {}
+        try:
+            for num_threads in thread_counts:
+                torch.set_num_threads(num_threads)
+                results[num_threads] = self.benchmark_inference(
+                    model, input_size, batch_sizes=[1], iterations=iterations
+                )[1]
+        finally:
+            torch.set_num_threads(original_threads)
+
         return results
 
     def benchmark_throughput(self, model, input_size=(640, 640), duration=60):
         """Benchmark maximum throughput"""
         batch_size = 1
         frames_processed = 0
-        start_time = time.time()
-        
-        dummy_input = torch.randn(batch_size, 3, *input_size).cuda()
-        
-        while (time.time() - start_time) < duration:
-            _ = model(dummy_input)
-            torch.cuda.synchronize()
-            frames_processed += batch_size
-        
-        total_time = time.time() - start_time
+
+        model, dummy_input = self._prepare(model, batch_size, input_size)
+
+        with torch.inference_mode(), self.timing() as timer:
+            start_time = time.perf_counter()
+            while (time.perf_counter() - start_time) < duration:
+                _ = model(dummy_input)
+                self._synchronize()
+                frames_processed += batch_size
+
+        total_time = timer.elapsed
         throughput = frames_processed / total_time
-        
+
         return {
             'frames_processed': frames_processed,
             'total_time': total_time,
@@ -92,47 +243,67 @@ class BenchmarkUtils:
 
     def profile_memory(self, model, input_size=(640, 640), batch_size=1):
         """Profile memory usage"""
-        dummy_input = torch.randn(batch_size, 3, *input_size).cuda()
-        
-        torch.cuda.reset_peak_memory_stats()
-        torch.cuda.empty_cache()
-        
-        # Initial memory
-        init_memory = torch.cuda.memory_allocated()
-        
-        # Run inference
-        _ = model(dummy_input)
-        torch.cuda.synchronize()
-        
-        # Peak memory
-        peak_memory = torch.cuda.max_memory_allocated()
-        
+        model, dummy_input = self._prepare(model, batch_size, input_size)
+
+        if self.is_cuda:
+            torch.cuda.reset_peak_memory_stats(self.device)
+            torch.cuda.empty_cache()
+
+            # Initial memory
+            init_memory = torch.cuda.memory_allocated(self.device)
+
+            # Run inference
+            with torch.inference_mode():
+                _ = model(dummy_input)
+            torch.cuda.synchronize(self.device)
+
+            # Peak memory
+            peak_memory = torch.cuda.max_memory_allocated(self.device)
+
+            return {
+                'initial_memory': init_memory / MB,  # MB
+                'peak_memory': peak_memory / MB,
+                'memory_increase': (peak_memory - init_memory) / MB
+            }
+
+        # CPU: peak resident set size sampled while the call runs
+        init_rss = self.process.memory_info().rss
+        with PeakRssSampler(self.process) as sampler:
+            with torch.inference_mode():
+                _ = model(dummy_input)
+
         return {
-            'initial_memory': init_memory / 1024**2,  # MB
-            'peak_memory': peak_memory / 1024**2,
-            'memory_increase': (peak_memory - init_memory) / 1024**2
+            'initial_memory': init_rss / MB,  # MB
+            'peak_memory': sampler.peak / MB,
+            'memory_increase': (sampler.peak - init_rss) / MB
         }
 
     def save_results(self, results, name='benchmark_results'):
         """Save benchmark results to file"""
         timestamp = time.strftime('%Y%m%d_%H%M%S')
         result_file = self.save_dir / f'{name}_{timestamp}.json'
-        
+
         with open(result_file, 'w') as f:
             json.dump(results, f, indent=4)
-        
+
         logger.info(f"Benchmark results saved to {result_file}")
+        return result_file
+
+    def run_comprehensive_benchmark(self, model, input_sizes=[(640, 640), (1280, 1280)], model_name=None):
+        """Run comprehensive benchmark suite
 
-    def run_comprehensive_benchmark(self, model, input_sizes=[(640, 640), (1280, 1280)]):
-        """Run comprehensive benchmark suite"""
+        ``model_name`` keys the results for baseline comparison and defaults
+        to the stem of the model's weights file.
+        """
         results = {
             'model_info': {
-                'name': model.__class__.__name__,
-                'device': next(model.parameters()).device.type
+                'name': model_name or get_model_name(model),
+                'device': self.device.type
             },
+            'environment': collect_environment(self.device),
             'benchmarks': {}
         }
-        
+
         for input_size in input_sizes:
             size_str = f"{input_size[0]}x{input_size[1]}"
             results['benchmarks'][size_str] = {
@@ -140,6 +311,8 @@ class BenchmarkUtils:
                 'throughput': self.benchmark_throughput(model, input_size),
                 'memory': self.profile_memory(model, input_size)
             }
-        
+            if not self.is_cuda:
+                results['benchmarks'][size_str]['threads'] = self.benchmark_threads(model, input_size)
+
         self.save_results(results)
-        return results
\ No newline at end of file
+        return results
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# cascade.py
+
+import logging
+import threading
+from queue import Queue, Full
+
+import numpy as np
+import supervision as sv
+from ultralytics import YOLO
+
+logger = logging.getLogger('YOLOv8-Cascade')
+
+
+def box_iou(boxes_a, boxes_b):
+    """Pairwise IoU of two ``(N, 4)`` and ``(M, 4)`` xyxy box arrays"""
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area_a = np.prod(boxes_a[:, 2:] - boxes_a[:, :2], axis=1)
+    area_b = np.prod(boxes_b[:, 2:] - boxes_b[:, :2], axis=1)
+    return intersection / (area_a[:, None] + area_b[None, :] - intersection + 1e-9)
+
+
+class CascadeEscalator:
+    def __init__(self, model_paths, uncertain_band=(0.25, 0.5), classes_of_interest=None,
+                 iou_threshold=0.5, queue_size=4, predict_kwargs=None, max_track_age=300):
+        """Re-check uncertain frames with larger models off the detection path.
+
+        A frame is escalated when any tracked detection has a confidence
+        inside ``uncertain_band`` or belongs to ``classes_of_interest``. The
+        first larger model runs on a background thread; if its answer is still
+        uncertain the frame moves on to the next model. Results are matched to
+        the frame's tracks by IoU and kept as per-track overrides of class and
+        confidence. Objects the nano model missed entirely are not injected
+        into the tracker.
+        """
+        self.uncertain_band = tuple(uncertain_band)
+        self.iou_threshold = iou_threshold
+        self.max_track_age = max_track_age
+        self.predict_kwargs = dict(predict_kwargs or {}, conf=self.uncertain_band[0])
+
+        self.models = []
+        for path in model_paths:
+            self.models.append(YOLO(path))
+            logger.info(f"Cascade model loaded: {path}")
+
+        names = self.models[0].names if self.models else {}
+        self.interest_ids = np.array(
+            [class_id for class_id, name in names.items() if name in set(classes_of_interest or [])],
+            dtype=np.int64
+        )
+
+        # tracker_id -> (class_id, confidence, last frame seen)
+        self.track_overrides = {}
+        self._frames_since_prune = 0
+        self._lock = threading.Lock()
+        self.queue = Queue(maxsize=queue_size)
+        self.escalated = 0
+        self.skipped = 0
+        self._thread = None
+
+    def start(self):
+        """Start the background escalation thread"""
+        self._thread = threading.Thread(target=self._escalation_thread, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self.queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _is_uncertain(self, detections):
+        if len(detections) == 0:
+            return False
+        low, high = self.uncertain_band
+        confidence = detections.confidence
+        if confidence is not None and np.any((confidence >= low) & (confidence < high)):
+            return True
+        return bool(np.isin(detections.class_id, self.interest_ids).any())
+
+    def should_escalate(self, detections):
+        """Whether a tracked frame needs a second opinion"""
+        return bool(self.models) and self._is_uncertain(detections)
+
+    def submit(self, frame_id, frame, detections):
+        """Queue a frame for escalation, skipping it if the larger model is busy"""
+        try:
+            self.queue.put_nowait((0, frame_id, frame.copy(), detections))
+            self.escalated += 1
+        except Full:
+            self.skipped += 1
+
+    def _escalation_thread(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            level, frame_id, frame, tracked = item
+            try:
+                results = self.models[level](frame, **self.predict_kwargs)[0]
+                refined = sv.Detections.from_yolov8(results)
+                self._merge(frame_id, tracked, refined)
+
+                # Still unsure: hand the frame to the next larger model
+                if level + 1 < len(self.models) and self._is_uncertain(refined):
+                    self.queue.put_nowait((level + 1, frame_id, frame, tracked))
+            except Full:
+                self.skipped += 1
+            except Exception as e:
+                logger.error(f"Error escalating frame {frame_id}: {e}")
+
+    def _merge(self, frame_id, tracked, refined):
+        """Attach the larger model's class and confidence to matching tracks"""
+        if tracked.tracker_id is None or len(tracked) == 0 or len(refined) == 0:
+            return
+        iou = box_iou(tracked.xyxy, refined.xyxy)
+        best = iou.argmax(axis=1)
+        matched = iou[np.arange(len(tracked)), best] >= self.iou_threshold
+
+        with self._lock:
+            for tracker_id, j in zip(tracked.tracker_id[matched], best[matched]):
+                self.track_overrides[int(tracker_id)] = (
+                    int(refined.class_id[j]), float(refined.confidence[j]), frame_id
+                )
+
+    def apply(self, frame_id, detections):
+        """Replace class and confidence of tracks the larger models have refined"""
+        with self._lock:
+            # Forget tracks that have not been seen for a while, whether or
+            # not this frame has anything tracked
+            self._frames_since_prune += 1
+            if self._frames_since_prune >= 100:
+                self._frames_since_prune = 0
+                cutoff = frame_id - self.max_track_age
+                self.track_overrides = {
+                    tracker_id: override for tracker_id, override in self.track_overrides.items()
+                    if override[2] >= cutoff
+                }
+
+            if detections.tracker_id is None or len(detections) == 0 or not self.track_overrides:
+                return detections
+
+            for i, tracker_id in enumerate(detections.tracker_id):
+                override = self.track_overrides.get(int(tracker_id))
+                if override is None:
+                    continue
+                class_id, confidence, _ = override
+                detections.class_id[i] = class_id
+                detections.confidence[i] = confidence
+                self.track_overrides[int(tracker_id)] = (class_id, confidence, frame_id)
+        return detections
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# detection_sink.py
+
+import bisect
+import logging
+import socket
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from pathlib import Path
+from queue import Queue, Empty, Full
+
+import numpy as np
+
+logger = logging.getLogger('YOLOv8-DetectionSink')
+
+DETECTION_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('frame_id', '<u8'),
+    ('stream_id', '<u2'),
+    ('track_id', '<i4'),
+    ('class_id', '<i2'),
+    ('confidence', '<f4'),
+    ('x1', '<f4'),
+    ('y1', '<f4'),
+    ('x2', '<f4'),
+    ('y2', '<f4'),
+])
+
+# magic, record count, raw size, compressed size
+CHUNK_HEADER = struct.Struct('<4sIII')
+CHUNK_MAGIC = b'EDC1'
+
+
+def detections_to_records(detections, frame_id, stream_id=0, timestamp=None):
+    """Convert ``sv.Detections`` into a structured array of DETECTION_DTYPE"""
+    records = np.empty(len(detections), dtype=DETECTION_DTYPE)
+    records['timestamp'] = time.time() if timestamp is None else timestamp
+    records['frame_id'] = frame_id
+    records['stream_id'] = stream_id
+    records['track_id'] = detections.tracker_id if detections.tracker_id is not None else -1
+    records['class_id'] = detections.class_id if detections.class_id is not None else -1
+    records['confidence'] = detections.confidence if detections.confidence is not None else np.nan
+    xyxy = np.asarray(detections.xyxy, dtype=np.float32).reshape(-1, 4)
+    records['x1'], records['y1'], records['x2'], records['y2'] = xyxy.T
+    return records
+
+
+def encode_chunk(records, level=3):
+    """Compress records into a self-describing chunk"""
+    raw = records.tobytes()
+    payload = zlib.compress(raw, level)
+    return CHUNK_HEADER.pack(CHUNK_MAGIC, len(records), len(raw), len(payload)) + payload
+
+
+def decode_chunk(chunk):
+    """Inverse of ``encode_chunk``"""
+    magic, count, raw_size, compressed_size = CHUNK_HEADER.unpack_from(chunk)
+    if magic != CHUNK_MAGIC:
+        raise ValueError("Not a detection chunk")
+    raw = zlib.decompress(chunk[CHUNK_HEADER.size:CHUNK_HEADER.size + compressed_size])
+    return np.frombuffer(raw, dtype=DETECTION_DTYPE, count=count)
+
+
+class FileSink:
+    def __init__(self, path='/workspace/results/detections', max_file_bytes=64 * 1024 ** 2):
+        """Append length-prefixed chunks to rotating files"""
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_file_bytes = max_file_bytes
+        self._file = None
+
+    def write(self, chunk):
+        if self._file is None or self._file.tell() >= self.max_file_bytes:
+            self.close()
+            name = f"detections_{time.strftime('%Y%m%d_%H%M%S')}_{time.time_ns() % 10**9:09d}.bin"
+            self._file = open(self.path / name, 'ab')
+        self._file.write(struct.pack('<I', len(chunk)) + chunk)
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class UnixSocketSink:
+    def __init__(self, socket_path, timeout=2.0):
+        """Send length-prefixed chunks over a Unix stream socket, reconnecting on failure"""
+        self.socket_path = str(socket_path)
+        self.timeout = timeout
+        self._sock = None
+
+    def write(self, chunk):
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(self.timeout)
+            try:
+                self._sock.connect(self.socket_path)
+            except OSError:
+                self.close()
+                raise
+        try:
+            self._sock.sendall(struct.pack('<I', len(chunk)) + chunk)
+        except OSError:
+            self.close()
+            raise
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+class LocalMessageBus:
+    """In-process stand-in for an MQTT or Kafka client, used in tests"""
+
+    def __init__(self, max_messages=1024):
+        self.topics = {}
+        self.max_messages = max_messages
+
+    def subscribe(self, topic):
+        """Queue receiving every payload published to ``topic``"""
+        return self.topics.setdefault(topic, Queue(maxsize=self.max_messages))
+
+    def publish(self, topic, payload):
+        self.subscribe(topic).put(payload, timeout=1.0)
+
+
+class MessageBusSink:
+    def __init__(self, client, topic='edge-ai/detections', method='publish', timeout=5.0, on_close=None):
+        """Publish chunks through any client exposing ``method(topic, payload)``,
+        e.g. paho-mqtt's ``publish`` or kafka-python's ``send``"""
+        self.client = client
+        self.topic = topic
+        self.timeout = timeout
+        self.on_close = on_close
+        self._publish = getattr(client, method)
+
+    def write(self, chunk):
+        result = self._publish(self.topic, chunk)
+        # Surface delivery failures so the chunk is spilled and retried
+        if getattr(result, 'rc', 0) != 0:
+            raise ConnectionError(f"Publish to {self.topic} failed with rc={result.rc}")
+        if hasattr(result, 'get'):
+            result.get(timeout=self.timeout)
+
+    def close(self):
+        if self.on_close is not None:
+            self.on_close()
+
+
+def create_bus_client(config):
+    """Connect the message bus client named by ``client`` ('mqtt' or 'kafka').
+
+    Returns ``(client, publish method name, close callback)``.
+    """
+    client_type = config.get('client', 'mqtt')
+    if client_type == 'mqtt':
+        import paho.mqtt.client as mqtt
+        client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        client.connect(config.get('host', 'localhost'), config.get('port', 1883))
+        client.loop_start()
+
+        def close():
+            client.loop_stop()
+            client.disconnect()
+        return client, 'publish', close
+    if client_type == 'kafka':
+        from kafka import KafkaProducer
+        client = KafkaProducer(bootstrap_servers=config.get('bootstrap_servers', 'localhost:9092'))
+
+        def close():
+            client.flush()
+            client.close()
+        return client, 'send', close
+    raise ValueError(f"Unknown message bus client: {client_type}")
+
+
+def create_sink(config):
+    """Build a sink from the ``output.sink`` configuration block"""
+    sink_type = config.get('type', 'file')
+    if sink_type == 'file':
+        return FileSink(config.get('path', '/workspace/results/detections'),
+                        int(config.get('max_file_mb', 64) * 1024 ** 2))
+    if sink_type == 'unix':
+        return UnixSocketSink(config['socket_path'])
+    if sink_type == 'bus':
+        client, method, close = create_bus_client(config)
+        return MessageBusSink(client, config.get('topic', 'edge-ai/detections'), method, on_close=close)
+    raise ValueError(f"Unknown sink type: {sink_type}")
+
+
+class DetectionSink:
+    def __init__(self, sink, max_records=1024, max_latency=1.0, queue_chunks=16,
+                 spill_dir='/workspace/results/detections_spill', max_spill_bytes=256 * 1024 ** 2,
+                 compression_level=3, retry_interval=1.0):
+        """Batch detections into compressed chunks and write them asynchronously.
+
+        Records are buffered until ``max_records`` or ``max_latency`` seconds,
+        then handed to a writer thread through a bounded queue. When the sink
+        is down or slow, chunks go to a bounded spill directory (oldest
+        evicted first): the writer spills what it cannot send, and chunks
+        that do not fit in the queue because the writer is stuck in a slow
+        write wait in memory until the writer spills them. Every chunk
+        carries a sequence number, so spilled chunks are replayed in order
+        once the sink catches up. ``add`` never blocks on the sink or disk.
+        """
+        self.sink = sink
+        self.max_records = max_records
+        self.max_latency = max_latency
+        self.compression_level = compression_level
+        self.retry_interval = retry_interval
+        self.spill_dir = Path(spill_dir)
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self.max_spill_bytes = max_spill_bytes
+
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._buffered = 0
+        self._buffer_started = None
+
+        self._queue = Queue(maxsize=queue_chunks)
+        self._spill_watermark = max(1, queue_chunks // 2)
+        # Chunks rejected by the full queue, spilled by the writer
+        self._overflow = deque()
+
+        # Spill state is only touched by the writer thread
+        self._spill_files = sorted(self.spill_dir.glob('chunk_*.bin'))
+        self._spill_sizes = {p: (p.stat().st_size, self._read_record_count(p)) for p in self._spill_files}
+        self._spill_bytes = sum(size for size, _ in self._spill_sizes.values())
+        self._seq = int(self._spill_files[-1].stem.split('_')[1]) + 1 if self._spill_files else 0
+        self._next_retry = 0.0
+
+        self.records_written = 0
+        self.records_dropped = 0
+
+        self._running = True
+        self._thread = threading.Thread(target=self._writer_thread, daemon=True)
+        self._thread.start()
+
+    @property
+    def spilled_chunks(self):
+        """Number of chunks waiting to be spilled or replayed from the spill directory"""
+        return len(self._spill_files) + len(self._overflow)
+
+    def add(self, detections, frame_id, stream_id=0, timestamp=None):
+        """Buffer the detections of one frame"""
+        if len(detections) == 0:
+            return
+        records = detections_to_records(detections, frame_id, stream_id, timestamp)
+        with self._lock:
+            if self._buffer_started is None:
+                self._buffer_started = time.monotonic()
+            self._buffer.append(records)
+            self._buffered += len(records)
+            if self._buffered >= self.max_records:
+                self._flush_locked()
+
+    def flush(self):
+        """Hand the current buffer to the writer"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        records = np.concatenate(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+        self._buffer_started = None
+        seq = self._seq
+        self._seq += 1
+        try:
+            self._queue.put_nowait((seq, records))
+        except Full:
+            # The writer is stuck on a slow sink: let it spill this chunk instead of dropping
+            self._overflow.append((seq, records))
+
+    def _flush_if_stale(self):
+        with self._lock:
+            if self._buffer_started is not None and time.monotonic() - self._buffer_started >= self.max_latency:
+                self._flush_locked()
+
+    def close(self):
+        """Flush remaining detections and stop the writer; unsent chunks stay spilled"""
+        self.flush()
+        self._running = False
+        self._thread.join()
+        self.sink.close()
+
+    def _spill_path(self, seq):
+        return self.spill_dir / f'chunk_{seq:012d}.bin'
+
+    @staticmethod
+    def _read_record_count(path):
+        try:
+            with open(path, 'rb') as f:
+                return CHUNK_HEADER.unpack(f.read(CHUNK_HEADER.size))[1]
+        except Exception:
+            return 0
+
+    def _spill(self, seq, chunk):
+        """Store a chunk in the spill directory, keeping files in sequence order"""
+        path = self._spill_path(seq)
+        count = CHUNK_HEADER.unpack_from(chunk)[1]
+        try:
+            path.write_bytes(chunk)
+        except Exception as e:
+            self.records_dropped += count
+            logger.error(f"Error spilling detections: {e}")
+            return
+        bisect.insort(self._spill_files, path)
+        self._spill_sizes[path] = (len(chunk), count)
+        self._spill_bytes += len(chunk)
+
+        # Bound the spill directory by evicting the oldest chunks
+        while self._spill_bytes > self.max_spill_bytes and len(self._spill_files) > 1:
+            oldest = self._spill_files.pop(0)
+            size, count = self._spill_sizes.pop(oldest)
+            self._spill_bytes -= size
+            self.records_dropped += count
+            oldest.unlink(missing_ok=True)
+
+    def _spill_overflow(self):
+        """Spill chunks that ``add`` could not queue"""
+        while self._overflow:
+            seq, records = self._overflow.popleft()
+            self._spill(seq, encode_chunk(records, self.compression_level))
+
+    def _has_spilled_before(self, seq):
+        return bool(self._spill_files) and self._spill_files[0] < self._spill_path(seq)
+
+    def _send(self, chunk):
+        """Write a chunk to the sink, returning False if it failed"""
+        if time.monotonic() < self._next_retry:
+            return False
+        try:
+            self.sink.write(chunk)
+            self.records_written += CHUNK_HEADER.unpack_from(chunk)[1]
+            return True
+        except Exception as e:
+            logger.warning(f"Detection sink unavailable, spilling to disk: {e}")
+            self._next_retry = time.monotonic() + self.retry_interval
+            return False
+
+    def _drain_spill(self):
+        """Replay spilled chunks in order while the sink accepts them"""
+        while self._queue.empty() and not self._overflow and self._spill_files:
+            path = self._spill_files[0]
+            chunk = path.read_bytes()
+            if not self._send(chunk):
+                return
+            self._spill_files.pop(0)
+            self._spill_bytes -= self._spill_sizes.pop(path)[0]
+            path.unlink()
+
+    def _writer_thread(self):
+        while self._running or not self._queue.empty() or self._overflow:
+            try:
+                seq, records = self._queue.get(timeout=min(self.max_latency, 0.5))
+            except Empty:
+                self._flush_if_stale()
+                self._spill_overflow()
+                self._drain_spill()
+                continue
+
+            # Anything that overflowed before this chunk was queued is older
+            self._spill_overflow()
+
+            chunk = encode_chunk(records, self.compression_level)
+            # Keep ordering: older chunks waiting in the spill go out first
+            backed_up = self._has_spilled_before(seq) or self._queue.qsize() >= self._spill_watermark
+            if backed_up or not self._send(chunk):
+                self._spill(seq, chunk)
+            self._flush_if_stale()
+            self._spill_overflow()
+            self._drain_spill()
+
+        # Last attempt to deliver the backlog before shutting down
+        self._drain_spill()
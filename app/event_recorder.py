@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# event_recorder.py
+
+import logging
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from queue import Queue
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger('YOLOv8-Recorder')
+
+
+class EventRecorder:
+    def __init__(self, output_path='/workspace/results/recordings', fps=30, codec='mp4v',
+                 pre_roll_seconds=5.0, post_roll_seconds=5.0, max_pre_roll_bytes=64 * 1024 ** 2,
+                 jpeg_quality=80, trigger_classes=None, dwell_seconds=None, class_names=None,
+                 writer_queue_size=512):
+        """Record clips around detection events without blocking the caller.
+
+        Every pushed frame is JPEG-encoded once into a pre-roll ring buffer
+        capped by both duration and bytes. When a trigger fires (a class in
+        ``trigger_classes`` is present, or a track has dwelled longer than
+        ``dwell_seconds``) the pre-roll and the following post-roll frames are
+        streamed to a background thread that decodes and writes the MP4.
+        Frames are dropped rather than waiting when the writer falls behind;
+        start and end messages are always queued so clips never merge.
+        Clips are written at the measured push rate, falling back to ``fps``
+        until it is known.
+        """
+        self.output_path = Path(output_path)
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        self.fps = fps
+        self.codec = codec
+        self.pre_roll_seconds = pre_roll_seconds
+        self.post_roll_seconds = post_roll_seconds
+        self.max_pre_roll_bytes = max_pre_roll_bytes
+        self.encode_params = [cv2.IMWRITE_JPEG_QUALITY, int(jpeg_quality)]
+        self.dwell_seconds = dwell_seconds
+
+        names = class_names or {}
+        self.trigger_ids = np.array(
+            [class_id for class_id, name in names.items() if name in set(trigger_classes or [])],
+            dtype=np.int64
+        )
+
+        self._pre_roll = deque()
+        self._pre_roll_bytes = 0
+        self._clip_end = None
+        self._first_seen = {}
+        self._last_seen = {}
+        self.dropped_frames = 0
+        self._last_push = None
+        self._interval = None
+
+        # Unbounded so control messages always fit; frames are capped separately
+        self.writer_queue_size = writer_queue_size
+        self._queued_frames = 0
+        self._queued_lock = threading.Lock()
+        self._queue = Queue()
+        self._thread = threading.Thread(target=self._writer_thread, daemon=True)
+        self._thread.start()
+
+    @property
+    def recording(self):
+        return self._clip_end is not None
+
+    def _check_triggers(self, detections, timestamp):
+        """Return the name of the trigger that fired, or None"""
+        dwelling = False
+        if self.dwell_seconds:
+            if detections.tracker_id is not None:
+                for tracker_id in detections.tracker_id:
+                    tracker_id = int(tracker_id)
+                    self._first_seen.setdefault(tracker_id, timestamp)
+                    self._last_seen[tracker_id] = timestamp
+            # Forget tracks that disappeared
+            for tracker_id, last in list(self._last_seen.items()):
+                if timestamp - last > 2.0:
+                    del self._last_seen[tracker_id]
+                    self._first_seen.pop(tracker_id, None)
+            dwelling = any(timestamp - first >= self.dwell_seconds for first in self._first_seen.values())
+
+        if len(detections) and len(self.trigger_ids) and np.isin(detections.class_id, self.trigger_ids).any():
+            return 'class'
+        return 'dwell' if dwelling else None
+
+    @property
+    def measured_fps(self):
+        """Rate frames are pushed at, or the configured fps until measured"""
+        if not self._interval:
+            return self.fps
+        return 1.0 / self._interval
+
+    def _send_frame(self, encoded):
+        with self._queued_lock:
+            if self._queued_frames >= self.writer_queue_size:
+                self.dropped_frames += 1
+                return False
+            self._queued_frames += 1
+        self._queue.put(('frame', encoded))
+        return True
+
+    def _send_control(self, kind, payload=None):
+        self._queue.put((kind, payload))
+
+    def push(self, frame, detections, timestamp=None):
+        """Add a processed frame and evaluate the recording triggers"""
+        timestamp = time.time() if timestamp is None else timestamp
+        if self._last_push is not None and timestamp > self._last_push:
+            interval = timestamp - self._last_push
+            self._interval = interval if self._interval is None else 0.9 * self._interval + 0.1 * interval
+        self._last_push = timestamp
+        ok, encoded = cv2.imencode('.jpg', frame, self.encode_params)
+        if not ok:
+            return
+        encoded = encoded.tobytes()
+        trigger = self._check_triggers(detections, timestamp)
+
+        if self.recording:
+            self._send_frame(encoded)
+            if trigger:
+                self._clip_end = timestamp + self.post_roll_seconds
+            elif timestamp >= self._clip_end:
+                self._send_control('end')
+                self._clip_end = None
+            return
+
+        if trigger:
+            name = f"event_{time.strftime('%Y%m%d_%H%M%S', time.localtime(timestamp))}_{trigger}.mp4"
+            logger.info(f"Recording triggered by {trigger}: {name}")
+            self._send_control('start', (self.output_path / name, self.measured_fps))
+            for _, buffered in self._pre_roll:
+                self._send_frame(buffered)
+            self._send_frame(encoded)
+            self._pre_roll.clear()
+            self._pre_roll_bytes = 0
+            self._clip_end = timestamp + self.post_roll_seconds
+            return
+
+        # Keep a bounded pre-roll of compressed frames
+        self._pre_roll.append((timestamp, encoded))
+        self._pre_roll_bytes += len(encoded)
+        while self._pre_roll and (
+            self._pre_roll_bytes > self.max_pre_roll_bytes
+            or timestamp - self._pre_roll[0][0] > self.pre_roll_seconds
+        ):
+            _, evicted = self._pre_roll.popleft()
+            self._pre_roll_bytes -= len(evicted)
+
+    def close(self):
+        """Finish any open clip and stop the writer thread"""
+        if self.recording:
+            self._send_control('end')
+            self._clip_end = None
+        self._queue.put(None)
+        self._thread.join()
+        if self.dropped_frames:
+            logger.warning(f"Recorder dropped {self.dropped_frames} frames while the writer was busy")
+
+    def _writer_thread(self):
+        writer = None
+        path = None
+        fps = self.fps
+        while True:
+            message = self._queue.get()
+            if message is None:
+                break
+            kind, payload = message
+            if kind == 'frame':
+                with self._queued_lock:
+                    self._queued_frames -= 1
+            try:
+                if kind == 'start':
+                    if writer is not None:
+                        writer.release()
+                        writer = None
+                    path, fps = payload
+                elif kind == 'frame' and path is not None:
+                    frame = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+                    if writer is None:
+                        height, width = frame.shape[:2]
+                        writer = cv2.VideoWriter(
+                            str(path), cv2.VideoWriter_fourcc(*self.codec), fps, (width, height)
+                        )
+                    writer.write(frame)
+                elif kind == 'end':
+                    if writer is not None:
+                        writer.release()
+                        logger.info(f"Recording saved to {path}")
+                    writer = None
+                    path = None
+            except Exception as e:
+                logger.error(f"Error writing recording {path}: {e}")
+        if writer is not None:
+            writer.release()
@@ -4,10 +4,13 @@
 import argparse
 import yaml
 import logging
+import signal
 import sys
+import time
 from pathlib import Path
 from realtime_detector import RealtimeObjectDetector
 from monitoring_service import MonitoringService
+from utils.tracing import FrameTracer
 import threading
 
 class YOLOApplication:
@@ -51,6 +54,11 @@ class YOLOApplication:
             action='store_true',
             help='Enable performance monitoring'
         )
+        parser.add_argument(
+            '--trace',
+            action='store_true',
+            help='Enable per-frame tracing (export with SIGUSR1 or on exit)'
+        )
         self.args = parser.parse_args()
 
     def load_config(self):
@@ -67,7 +75,9 @@ class YOLOApplication:
         """Start the monitoring service in a separate thread"""
         if self.args.enable_monitoring:
             self.logger.info("Starting monitoring service...")
-            self.monitoring_service = MonitoringService()
+            self.monitoring_service = MonitoringService(
+                performance_monitor=self.detector.performance_monitor
+            )
             self.monitoring_thread = threading.Thread(
                 target=self.monitoring_service.start_monitoring
             )
@@ -77,12 +87,27 @@ class YOLOApplication:
     def initialize_detector(self):
         """Initialize the YOLOv8 detector"""
         try:
+            tracing_config = self.config.get('tracing', {})
+            self.tracer = FrameTracer(
+                enabled=self.args.trace or tracing_config.get('enabled', False),
+                sample_every=tracing_config.get('sample_every', 10),
+                capacity=tracing_config.get('capacity', 65536)
+            )
             self.detector = RealtimeObjectDetector(
-                model_path=self.config['model_path'],
-                conf_threshold=self.config['conf_threshold'],
-                buffer_size=self.config['buffer_size']
+                model_path=self.config['model']['path'],
+                conf_threshold=self.config['model']['conf_threshold'],
+                buffer_size=self.config['processing']['buffer_size'],
+                tracer=self.tracer,
+                input_size=self.config['model'].get('input_size'),
+                batch_size=self.config['processing'].get('batch_size', 1),
+                tuned_profile_dir=self.config['processing'].get('tuned_profile_dir'),
+                cascade_config=self.config.get('cascade'),
+                recording_config=self.config.get('recording'),
+                output_config=self.config.get('output')
             )
             self.logger.info("Detector initialized successfully")
+            if self.tracer.enabled and hasattr(signal, 'SIGUSR1'):
+                signal.signal(signal.SIGUSR1, lambda signum, frame: self.export_trace())
             return True
         except Exception as e:
             self.logger.error(f"Error initializing detector: {e}")
@@ -90,19 +115,19 @@ class YOLOApplication:
 
     def run(self):
         """Main application run method"""
-        # Start monitoring if enabled
-        self.start_monitoring_service()
-
         # Initialize detector
         if not self.initialize_detector():
             return
 
+        # Start monitoring if enabled
+        self.start_monitoring_service()
+
         # Start real-time detection
         try:
             self.logger.info("Starting real-time detection...")
             self.detector.process_camera(
                 source=self.args.source,
-                display_stats=self.config['display_stats']
+                display_stats=self.config['display']['show_fps']
             )
         except KeyboardInterrupt:
             self.logger.info("Application stopped by user")
@@ -111,8 +136,19 @@ class YOLOApplication:
         finally:
             self.cleanup()
 
+    def export_trace(self):
+        """Write recorded frame spans as Chrome trace JSON"""
+        trace_dir = Path(self.config.get('tracing', {}).get('output_path', '/workspace/results/traces'))
+        try:
+            self.tracer.export_chrome_trace(trace_dir / f"trace_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        except Exception as e:
+            self.logger.error(f"Error exporting trace: {e}")
+
     def cleanup(self):
         """Cleanup resources"""
+        if self.tracer.enabled:
+            self.export_trace()
+
         # Stop monitoring service if running
         if self.args.enable_monitoring:
             try:
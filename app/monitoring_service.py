@@ -7,11 +7,14 @@ import json
 from pathlib import Path
 import logging
 from utils.performance import PerformanceMonitor
+from utils.metrics_stream import MetricsPublisher
+from utils.metrics_exporter import MetricsExporter
+from utils.alerts import AlertEngine, AlertDispatcher
 import threading
 from datetime import datetime
 
 class MonitoringService:
-    def __init__(self, config_path='/workspace/configs/monitoring_config.yaml'):
+    def __init__(self, config_path='/workspace/configs/monitoring_config.yaml', performance_monitor=None):
         # Setup logging
         self.setup_logging()
         self.logger = logging.getLogger('YOLOv8-Monitoring')
@@ -19,8 +22,8 @@ class MonitoringService:
         # Load configuration
         self.config = self.load_config(config_path)
         
-        # Initialize monitoring
-        self.performance_monitor = PerformanceMonitor(
+        # Initialize monitoring; share the detector's monitor when running in-process
+        self.performance_monitor = performance_monitor or PerformanceMonitor(
             buffer_size=self.config.get('buffer_size', 30)
         )
         
@@ -32,6 +35,36 @@ class MonitoringService:
         self.is_monitoring = False
         self.monitoring_interval = self.config.get('monitoring_interval', 1.0)
 
+        # Push metric deltas to dashboard clients
+        self.publisher = None
+        stream_config = self.config.get('streaming', {})
+        if stream_config.get('enabled', False):
+            self.publisher = MetricsPublisher(
+                host=stream_config.get('host', '0.0.0.0'),
+                port=stream_config.get('port', 8765),
+                client_queue_size=stream_config.get('client_queue_size', 32),
+                drop_policy=stream_config.get('drop_policy', 'drop_oldest')
+            )
+
+        # Compile alert rules once; they are evaluated on every tick
+        alerting_config = self.config.get('alerting', {})
+        self.alert_engine = AlertEngine(
+            self.config.get('alerts', {}),
+            dispatcher=AlertDispatcher(
+                webhook_url=alerting_config.get('webhook_url'),
+                max_per_minute=alerting_config.get('max_notifications_per_minute', 30)
+            )
+        )
+
+        # Serve OpenMetrics for Prometheus scrapes
+        self.exporter = None
+        exporter_config = self.config.get('exporter', {})
+        if exporter_config.get('enabled', False):
+            self.exporter = MetricsExporter(
+                host=exporter_config.get('host', '0.0.0.0'),
+                port=exporter_config.get('port', 9108)
+            )
+
     def setup_logging(self):
         """Setup logging configuration"""
         logging.basicConfig(
@@ -56,7 +89,12 @@ class MonitoringService:
         """Start the monitoring service"""
         self.logger.info("Starting monitoring service...")
         self.is_monitoring = True
-        
+
+        if self.publisher is not None:
+            self.publisher.start()
+        if self.exporter is not None:
+            self.exporter.start()
+
         # Start monitoring thread
         self.monitor_thread = threading.Thread(target=self._monitoring_loop)
         self.monitor_thread.start()
@@ -67,6 +105,11 @@ class MonitoringService:
         self.is_monitoring = False
         if hasattr(self, 'monitor_thread'):
             self.monitor_thread.join()
+        if self.publisher is not None:
+            self.publisher.stop()
+        if self.exporter is not None:
+            self.exporter.stop()
+        self.alert_engine.close()
 
     def _monitoring_loop(self):
         """Main monitoring loop"""
@@ -80,6 +123,17 @@ class MonitoringService:
                 
                 # Save metrics to file
                 self._save_metrics(stats)
+
+                # Evaluate alert rules
+                self.alert_engine.evaluate(stats)
+
+                # Push changed metrics to subscribers
+                if self.publisher is not None:
+                    self.publisher.publish(stats)
+
+                # Pre-render the scrape payload
+                if self.exporter is not None:
+                    self.exporter.update(self.performance_monitor.get_snapshot(), stats)
                 
                 # Wait for next monitoring interval
                 time.sleep(self.monitoring_interval)
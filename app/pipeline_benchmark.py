@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# pipeline_benchmark.py
+
+import argparse
+import itertools
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+from queue import Empty, Full
+
+import cv2
+import numpy as np
+
+from benchmark_utils import BenchmarkUtils, collect_environment
+from realtime_detector import RealtimeObjectDetector
+from utils.tracing import FrameTracer
+
+logger = logging.getLogger('YOLOv8-PipelineBenchmark')
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.bmp'}
+
+
+class FrameSource:
+    def __init__(self, path, loop=True):
+        """Replay a video file or an image directory, decoding every frame"""
+        self.path = Path(path)
+        self.loop = loop
+        self.cap = None
+        self.images = []
+        self.index = 0
+
+        if self.path.is_dir():
+            self.images = sorted(p for p in self.path.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+            if not self.images:
+                raise ValueError(f"No images found in {self.path}")
+        else:
+            self.cap = cv2.VideoCapture(str(self.path))
+            if not self.cap.isOpened():
+                raise ValueError(f"Error opening video {self.path}")
+
+    def read(self):
+        """Decode the next frame, or return None when the source is exhausted"""
+        if self.cap is None:
+            if self.index >= len(self.images):
+                if not self.loop:
+                    return None
+                self.index = 0
+            frame = cv2.imread(str(self.images[self.index]))
+            self.index += 1
+            return frame
+
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+
+def _summarize(values_ms):
+    if not values_ms:
+        return {'count': 0}
+    return {
+        'count': len(values_ms),
+        'mean_ms': float(np.mean(values_ms)),
+        'p50_ms': float(np.percentile(values_ms, 50)),
+        'p95_ms': float(np.percentile(values_ms, 95)),
+        'p99_ms': float(np.percentile(values_ms, 99)),
+        'max_ms': float(np.max(values_ms))
+    }
+
+
+class PipelineBenchmark:
+    def __init__(self, model_path, source, conf_threshold=0.3, buffer_size=30,
+                 save_dir='/workspace/results/benchmarks', tuned_profile_dir=None):
+        """Benchmark the full RealtimeObjectDetector pipeline on recorded input.
+
+        Frames are decoded, queued, inferred, tracked and annotated exactly as
+        in live operation, only the display is skipped. Tuned profiles are
+        ignored unless ``tuned_profile_dir`` is given; the applied profile is
+        then recorded with the results and keys their baselines.
+        """
+        self.model_path = model_path
+        self.source = source
+        self.conf_threshold = conf_threshold
+        self.buffer_size = buffer_size
+        self.save_dir = save_dir
+        self.tuned_profile_dir = tuned_profile_dir
+        self.tuned_profile = None
+
+    def _produce(self, detector, stats, rate, max_frames, deadline):
+        """Decode frames and feed the detector, dropping when a paced queue is full"""
+        source = FrameSource(self.source)
+        interval = 1.0 / rate if rate > 0 else 0.0
+        next_time = time.perf_counter()
+        try:
+            for frame_id in itertools.count(1):
+                if frame_id > max_frames or time.perf_counter() >= deadline:
+                    break
+                capture_start_ns = time.perf_counter_ns()
+                frame = source.read()
+                if frame is None:
+                    break
+                detector.tracer.add_span('capture', frame_id, detector.stream_id,
+                                         capture_start_ns, time.perf_counter_ns())
+
+                enqueued_ns = time.perf_counter_ns()
+                stats['enqueued'][frame_id] = enqueued_ns
+                stats['offered'] += 1
+                item = (frame_id, frame, enqueued_ns)
+                if rate > 0:
+                    # Paced replay behaves like a camera: drop when saturated
+                    try:
+                        detector.frame_queue.put_nowait(item)
+                    except Full:
+                        stats['enqueued'].pop(frame_id, None)
+                        stats['dropped'] += 1
+                        detector.performance_monitor.record_drop()
+                    next_time += interval
+                    time.sleep(max(0.0, next_time - time.perf_counter()))
+                else:
+                    # Unthrottled replay applies backpressure to find peak throughput
+                    detector.frame_queue.put(item)
+        finally:
+            source.release()
+            stats['producer_done'] = True
+
+    def _consume(self, detector, stats, annotate):
+        """Collect results, measuring end-to-end latency and annotating frames"""
+        while True:
+            if stats['producer_done'] and stats['processed'] + stats['dropped'] >= stats['offered']:
+                break
+            try:
+                frame_id, frame, detections = detector.result_queue.get(timeout=5.0)
+            except Empty:
+                if stats['producer_done']:
+                    break
+                continue
+
+            if annotate:
+                with detector.tracer.span('annotate', frame_id, detector.stream_id):
+                    detector.annotate_frame(frame, detections)
+
+            enqueued_ns = stats['enqueued'].pop(frame_id, None)
+            if enqueued_ns is not None:
+                stats['latencies_ms'].append((time.perf_counter_ns() - enqueued_ns) / 1e6)
+            stats['processed'] += 1
+            stats['detections'] += len(detections)
+            stats['last_result'] = time.perf_counter()
+
+    def run(self, num_streams=1, num_workers=1, rate=0.0, max_frames=300, duration=None, annotate=True):
+        """Replay the source through ``num_streams`` detectors with ``num_workers`` each"""
+        tracer = FrameTracer(enabled=True, sample_every=1, capacity=1_000_000)
+        detectors = [
+            RealtimeObjectDetector(
+                model_path=self.model_path,
+                conf_threshold=self.conf_threshold,
+                buffer_size=self.buffer_size,
+                stream_id=stream_id,
+                tracer=tracer,
+                tuned_profile_dir=self.tuned_profile_dir
+            )
+            for stream_id in range(num_streams)
+        ]
+        # Warm up so model initialization does not count as latency
+        warmup_source = FrameSource(self.source)
+        warmup_frame = warmup_source.read()
+        warmup_source.release()
+        self.tuned_profile = detectors[0].tuned_profile
+        for detector in detectors:
+            detector.start_processing_thread(num_workers=num_workers, warmup_frame=warmup_frame)
+
+        all_stats = [
+            {'offered': 0, 'processed': 0, 'dropped': 0, 'detections': 0,
+             'enqueued': {}, 'latencies_ms': [], 'producer_done': False, 'last_result': None}
+            for _ in detectors
+        ]
+        start = time.perf_counter()
+        deadline = start + duration if duration else float('inf')
+        threads = []
+        for detector, stats in zip(detectors, all_stats):
+            threads.append(threading.Thread(
+                target=self._produce, args=(detector, stats, rate, max_frames, deadline), daemon=True
+            ))
+            threads.append(threading.Thread(
+                target=self._consume, args=(detector, stats, annotate), daemon=True
+            ))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        end = max([s['last_result'] for s in all_stats if s['last_result']] or [time.perf_counter()])
+
+        for detector in detectors:
+            detector.stop_processing_threads()
+
+        # Per-stage breakdown from the trace spans
+        stage_ms = {}
+        for name, _, _, _, duration_ns, _ in tracer.spans():
+            stage_ms.setdefault(name, []).append(duration_ns / 1e6)
+
+        wall_time = end - start
+        offered = sum(s['offered'] for s in all_stats)
+        processed = sum(s['processed'] for s in all_stats)
+        dropped = sum(s['dropped'] for s in all_stats)
+        latencies = [lat for s in all_stats for lat in s['latencies_ms']]
+
+        return {
+            'streams': num_streams,
+            'workers': num_workers,
+            'rate': rate,
+            'wall_time': wall_time,
+            'frames_offered': offered,
+            'frames_processed': processed,
+            'frames_dropped': dropped,
+            'drop_rate': dropped / offered if offered else 0.0,
+            'throughput_fps': processed / wall_time if wall_time > 0 else 0.0,
+            'per_stream_fps': [s['processed'] / wall_time if wall_time > 0 else 0.0 for s in all_stats],
+            'mean_detections': sum(s['detections'] for s in all_stats) / processed if processed else 0.0,
+            'latency': _summarize(latencies),
+            'latency_samples_ms': latencies,
+            'stages': {name: _summarize(values) for name, values in sorted(stage_ms.items())}
+        }
+
+    def run_scaling(self, stream_counts=(1, 2, 4), worker_counts=(1, 2), **kwargs):
+        """Sweep stream and worker counts and save the resulting scaling curve"""
+        results = {
+            'model_info': {'name': Path(self.model_path).stem},
+            'model': self.model_path,
+            'source': str(self.source),
+            'runs': []
+        }
+        for num_streams, num_workers in itertools.product(stream_counts, worker_counts):
+            logger.info(f"Running pipeline benchmark: {num_streams} stream(s), {num_workers} worker(s)")
+            run = self.run(num_streams=num_streams, num_workers=num_workers, **kwargs)
+            results['runs'].append(run)
+            logger.info(
+                f"streams={num_streams} workers={num_workers}: "
+                f"{run['throughput_fps']:.1f} FPS, "
+                f"p95 latency {run['latency'].get('p95_ms', float('nan')):.1f}ms, "
+                f"drop rate {run['drop_rate']:.1%}"
+            )
+
+        # Captured after the runs so thread counts reflect any applied profile
+        results['environment'] = collect_environment(
+            self.tuned_profile.get('device') if self.tuned_profile else None
+        )
+        results['tuned_profile'] = self.tuned_profile
+        BenchmarkUtils(save_dir=self.save_dir).save_results(results, name='pipeline_benchmark')
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end YOLOv8 pipeline benchmark')
+    parser.add_argument('--model', default='/workspace/models/yolov8n.pt', help='Model path')
+    parser.add_argument('--source', default='/workspace/data/test_images',
+                        help='Video file or image directory to replay')
+    parser.add_argument('--streams', type=int, nargs='+', default=[1, 2, 4], help='Stream counts to sweep')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2], help='Worker counts to sweep')
+    parser.add_argument('--rate', type=float, default=0.0,
+                        help='Replay FPS per stream; 0 replays unthrottled')
+    parser.add_argument('--frames', type=int, default=300, help='Frames per stream')
+    parser.add_argument('--duration', type=float, default=None, help='Optional time limit per run (s)')
+    parser.add_argument('--no-annotate', action='store_true', help='Skip frame annotation')
+    parser.add_argument('--save-dir', default='/workspace/results/benchmarks', help='Results directory')
+    parser.add_argument('--tuned-profile-dir', default=None,
+                        help='Apply this host\'s tuned profile from this directory (ignored by default)')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+
+    benchmark = PipelineBenchmark(args.model, args.source, save_dir=args.save_dir,
+                                  tuned_profile_dir=args.tuned_profile_dir)
+    benchmark.run_scaling(
+        stream_counts=args.streams,
+        worker_counts=args.workers,
+        rate=args.rate,
+        max_frames=args.frames,
+        duration=args.duration,
+        annotate=not args.no_annotate
+    )
+
+
+if __name__ == '__main__':
+    main()
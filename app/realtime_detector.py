@@ -6,24 +6,50 @@ import torch
 import supervision as sv
 import numpy as np
 import time
+import heapq
+import itertools
 from collections import deque
 import threading
-from queue import Queue
+from queue import Queue, Empty
 from ultralytics import YOLO
 import logging
 from utils.performance import PerformanceMonitor
+from utils.tracing import FrameTracer
+from autotune import DEFAULT_PROFILE_DIR, load_tuned_profile, apply_thread_settings
+from cascade import CascadeEscalator
+from event_recorder import EventRecorder
+from detection_sink import DetectionSink, create_sink
 
 logger = logging.getLogger('YOLOv8-Realtime')
 
 class RealtimeObjectDetector:
-    def __init__(self, model_path='yolov8n.pt', conf_threshold=0.3, buffer_size=30):
+    def __init__(self, model_path='yolov8n.pt', conf_threshold=0.3, buffer_size=30,
+                 stream_id=0, tracer=None, input_size=None, batch_size=1,
+                 tuned_profile_dir=DEFAULT_PROFILE_DIR, cascade_config=None,
+                 recording_config=None, output_config=None):
         """
         Initialize real-time detector with performance monitoring
+
+        If ``tuned_profile_dir`` holds a profile written by autotune.py for
+        this host, its threads, batch size, input size and device override
+        the arguments.
         """
         self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        self.input_size = input_size
+        self.batch_size = batch_size
+
+        profile = load_tuned_profile(tuned_profile_dir) if tuned_profile_dir else None
+        self.tuned_profile = profile
+        if profile:
+            apply_thread_settings(profile)
+            self.device = profile.get('device', self.device)
+            self.input_size = profile.get('input_size', self.input_size)
+            self.batch_size = profile.get('batch_size', self.batch_size)
+            logger.info(f"Applied tuned profile: {profile}")
         logger.info(f"Using device: {self.device}")
         
         # Load model
+        self.model_path = model_path
         try:
             self.model = YOLO(model_path)
             logger.info(f"Model loaded successfully: {model_path}")
@@ -33,6 +59,63 @@ class RealtimeObjectDetector:
         
         self.conf_threshold = conf_threshold
         self.performance_monitor = PerformanceMonitor(buffer_size)
+
+        # Arguments passed on every model call
+        self.predict_kwargs = {
+            'conf': conf_threshold,
+            'device': 0 if self.device == 'cuda' else self.device,
+            'verbose': False
+        }
+        if self.input_size:
+            self.predict_kwargs['imgsz'] = list(self.input_size)
+
+        # Cascade mode: escalate uncertain frames to larger models
+        self.cascade = None
+        if cascade_config and cascade_config.get('enabled', False):
+            self.cascade = CascadeEscalator(
+                model_paths=cascade_config.get('models', []),
+                uncertain_band=cascade_config.get('uncertain_band', (0.25, 0.5)),
+                classes_of_interest=cascade_config.get('classes_of_interest'),
+                iou_threshold=cascade_config.get('iou_threshold', 0.5),
+                queue_size=cascade_config.get('queue_size', 4),
+                predict_kwargs=self.predict_kwargs
+            )
+            # The nano model must report the uncertain band to escalate it
+            self.predict_kwargs['conf'] = min(conf_threshold, self.cascade.uncertain_band[0])
+
+        # Event-triggered clip recording
+        self.recorder = None
+        if recording_config and recording_config.get('enabled', False):
+            triggers = recording_config.get('triggers', {})
+            self.recorder = EventRecorder(
+                output_path=recording_config.get('output_path', '/workspace/results/recordings'),
+                fps=recording_config.get('fps', 30),
+                codec=recording_config.get('codec', 'mp4v'),
+                pre_roll_seconds=recording_config.get('pre_roll_seconds', 5.0),
+                post_roll_seconds=recording_config.get('post_roll_seconds', 5.0),
+                max_pre_roll_bytes=int(recording_config.get('max_pre_roll_mb', 64) * 1024 ** 2),
+                jpeg_quality=recording_config.get('jpeg_quality', 80),
+                trigger_classes=triggers.get('classes'),
+                dwell_seconds=triggers.get('dwell_seconds'),
+                class_names=self.model.names
+            )
+
+        # Structured detection output, batched off the inference path
+        self.detection_sink = None
+        if output_config and output_config.get('enabled', False):
+            self.detection_sink = DetectionSink(
+                create_sink(output_config.get('sink', {})),
+                max_records=output_config.get('max_records', 1024),
+                max_latency=output_config.get('max_latency', 1.0),
+                queue_chunks=output_config.get('queue_chunks', 16),
+                spill_dir=output_config.get('spill_dir', '/workspace/results/detections_spill'),
+                max_spill_bytes=int(output_config.get('max_spill_mb', 256) * 1024 ** 2)
+            )
+
+        # Per-frame tracing; disabled unless a tracer is supplied
+        self.stream_id = stream_id
+        self.tracer = tracer or FrameTracer(enabled=False)
+        self.frame_id = 0
         
         # Initialize queues for frame processing
         self.frame_queue = Queue(maxsize=buffer_size)
@@ -45,42 +128,149 @@ class RealtimeObjectDetector:
             text_scale=1
         )
         
-        # Initialize object tracker
+        # Initialize object tracker; shared by all workers
         self.tracker = sv.ByteTrack()
+        self.processing_threads = []
         self.trace_annotator = sv.TraceAnnotator(
             thickness=2,
             trace_length=15
         )
 
-    def start_processing_thread(self):
-        """Start the background processing thread"""
-        self.processing_thread = threading.Thread(
-            target=self._process_frames_thread,
-            daemon=True
-        )
-        self.processing_thread.start()
+        # Workers finish out of order; frames are tracked and emitted in
+        # dequeue order through a small reorder buffer
+        self._dequeue_lock = threading.Lock()
+        self._next_seq = 0
+        self._order_lock = threading.Lock()
+        self._reorder = []
+        self._next_release = 0
+
+    def start_processing_thread(self, num_workers=1, warmup_frame=None):
+        """Start the background processing threads
+
+        Extra workers load their own copy of the model since YOLO predictors
+        are not safe to share between threads. If ``warmup_frame`` is given,
+        every worker's model runs it once before its thread starts.
+        """
+        if self.cascade is not None:
+            self.cascade.start()
+        for worker_id in range(num_workers):
+            model = self.model if worker_id == 0 else YOLO(self.model_path)
+            if warmup_frame is not None:
+                model(warmup_frame, **self.predict_kwargs)
+            thread = threading.Thread(
+                target=self._process_frames_thread,
+                args=(model,),
+                daemon=True
+            )
+            thread.start()
+            self.processing_threads.append(thread)
+        self.processing_thread = self.processing_threads[0]
 
-    def _process_frames_thread(self):
+    def _process_frames_thread(self, model=None):
         """Background thread for frame processing"""
-        while True:
-            frame = self.frame_queue.get()
-            if frame is None:
-                break
-            
+        model = model or self.model
+        running = True
+        while running:
+            # One worker dequeues at a time so sequence numbers follow queue order
+            with self._dequeue_lock:
+                item = self.frame_queue.get()
+                if item is None:
+                    break
+                batch = [item]
+
+                # Batch up frames that are already waiting, without delaying the first
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self.frame_queue.get_nowait()
+                    except Empty:
+                        break
+                    if item is None:
+                        running = False
+                        break
+                    batch.append(item)
+
+                first_seq = self._next_seq
+                self._next_seq += len(batch)
+
+            self._process_batch(model, batch, first_seq)
+
+    def _process_batch(self, model, batch, first_seq):
+        """Run inference on a batch of queued frames, then track them in order"""
+        dequeued_ns = time.perf_counter_ns()
+        for frame_id, _, enqueued_ns in batch:
+            self.tracer.add_span('queue_wait', frame_id, self.stream_id, enqueued_ns, dequeued_ns)
+
+        # Process frames with performance monitoring
+        with self.performance_monitor.measure_processing_time(frames=len(batch)):
+            batch_results = [None] * len(batch)
             try:
-                # Process frame with performance monitoring
-                with self.performance_monitor.measure_processing_time():
-                    # Run inference
-                    results = self.model(frame, conf=self.conf_threshold)[0]
-                    detections = sv.Detections.from_yolov8(results)
-                    
-                    # Update tracks
-                    detections = self.tracker.update_with_detections(detections)
-                
-                self.result_queue.put((frame, detections))
+                # Run inference
+                with self.performance_monitor.measure_stage('inference'):
+                    infer_start_ns = time.perf_counter_ns()
+                    batch_results = model([frame for _, frame, _ in batch], **self.predict_kwargs)
             except Exception as e:
                 logger.error(f"Error processing frame: {e}")
-                continue
+            if len(batch_results) != len(batch):
+                logger.error(f"Model returned {len(batch_results)} results for {len(batch)} frames")
+                batch_results = [None] * len(batch)
+
+            for seq, (frame_id, frame, _), results in zip(itertools.count(first_seq), batch, batch_results):
+                detections = None
+                try:
+                    if results is not None:
+                        detections = sv.Detections.from_yolov8(results)
+                        self._trace_model_stages(frame_id, infer_start_ns, results)
+                except Exception as e:
+                    detections = None
+                    logger.error(f"Error processing frame {frame_id}: {e}")
+                # Failed frames still release their sequence number so the
+                # reorder buffer never stalls behind them
+                self._release_in_order(seq, frame_id, frame, detections)
+
+    def _release_in_order(self, seq, frame_id, frame, detections):
+        """Track and emit every frame whose predecessors have all been released"""
+        with self._order_lock:
+            heapq.heappush(self._reorder, (seq, frame_id, frame, detections))
+            while self._reorder and self._reorder[0][0] == self._next_release:
+                _, frame_id, frame, detections = heapq.heappop(self._reorder)
+                self._next_release += 1
+                if detections is not None:
+                    self._finish_frame(frame_id, frame, detections)
+
+    def _finish_frame(self, frame_id, frame, detections):
+        """Update tracks, apply the cascade and emit one frame"""
+        try:
+            with self.performance_monitor.measure_stage('tracking'), \
+                    self.tracer.span('track', frame_id, self.stream_id):
+                detections = self.tracker.update_with_detections(detections)
+
+            if self.cascade is not None:
+                detections = self._apply_cascade(frame_id, frame, detections)
+
+            if self.detection_sink is not None:
+                self.detection_sink.add(detections, frame_id, self.stream_id)
+
+            self.result_queue.put((frame_id, frame, detections))
+        except Exception as e:
+            logger.error(f"Error processing frame: {e}")
+
+    def _apply_cascade(self, frame_id, frame, detections):
+        """Escalate uncertain frames and merge refined classes into the tracks"""
+        with self.tracer.span('cascade', frame_id, self.stream_id):
+            if self.cascade.should_escalate(detections):
+                self.cascade.submit(frame_id, frame, detections)
+            detections = self.cascade.apply(frame_id, detections)
+            return detections[detections.confidence >= self.conf_threshold]
+
+    def _trace_model_stages(self, frame_id, start_ns, results):
+        """Split the model call into preprocess, infer and NMS spans"""
+        if not self.tracer.sampled(frame_id):
+            return
+        speed = getattr(results, 'speed', None) or {}
+        for stage, key in (('preprocess', 'preprocess'), ('infer', 'inference'), ('nms', 'postprocess')):
+            duration_ns = int(speed.get(key, 0.0) * 1e6)
+            self.tracer.add_span(stage, frame_id, self.stream_id, start_ns, start_ns + duration_ns)
+            start_ns += duration_ns
 
     def process_camera(self, source=0, display_stats=True):
         """Process camera feed with real-time statistics"""
@@ -95,18 +285,30 @@ class RealtimeObjectDetector:
                 raise ValueError(f"Error opening camera {source}")
             
             while cap.isOpened():
+                capture_start_ns = time.perf_counter_ns()
                 ret, frame = cap.read()
                 if not ret:
                     break
+                self.frame_id += 1
+                self.tracer.add_span('capture', self.frame_id, self.stream_id,
+                                     capture_start_ns, time.perf_counter_ns())
                 
                 # Add frame to processing queue if not full
                 if not self.frame_queue.full():
-                    self.frame_queue.put(frame)
+                    self.frame_queue.put((self.frame_id, frame, time.perf_counter_ns()))
+                else:
+                    self.performance_monitor.record_drop()
+                self.performance_monitor.set_queue_depth('frame', self.frame_queue.qsize())
+                self.performance_monitor.set_queue_depth('result', self.result_queue.qsize())
                 
                 # Get and display processed results
                 if not self.result_queue.empty():
+                    frame_id, frame, detections = self.result_queue.get()
+                    if self.recorder is not None:
+                        with self.tracer.span('record', frame_id, self.stream_id):
+                            self.recorder.push(frame, detections)
                     self._display_processed_frame(
-                        *self.result_queue.get(),
+                        frame_id, frame, detections,
                         display_stats=display_stats
                     )
                 
@@ -118,8 +320,21 @@ class RealtimeObjectDetector:
         finally:
             self._cleanup()
 
-    def _display_processed_frame(self, frame, detections, display_stats=True):
+    def _display_processed_frame(self, frame_id, frame, detections, display_stats=True):
         """Display processed frame with annotations and stats"""
+        with self.tracer.span('annotate', frame_id, self.stream_id):
+            frame = self.annotate_frame(frame, detections)
+        
+        # Add performance stats overlay
+        if display_stats:
+            stats = self.get_performance_stats(include_system=False)
+            self._add_stats_overlay(frame, stats, len(detections))
+        
+        with self.tracer.span('display', frame_id, self.stream_id):
+            cv2.imshow('YOLOv8 Real-time Detection', frame)
+
+    def annotate_frame(self, frame, detections):
+        """Draw detections and tracks onto the frame"""
         # Create labels for detected objects
         labels = [
             f"{self.model.names[class_id]} {confidence:0.2f}"
@@ -128,15 +343,10 @@ class RealtimeObjectDetector:
         ]
         
         # Draw detections and traces
-        frame = self.trace_annotator.annotate(frame, detections)
-        frame = self.box_annotator.annotate(frame, detections, labels)
-        
-        # Add performance stats overlay
-        if display_stats:
-            stats = self.get_performance_stats()
-            self._add_stats_overlay(frame, stats, len(detections))
-        
-        cv2.imshow('YOLOv8 Real-time Detection', frame)
+        with self.performance_monitor.measure_stage('annotate'):
+            frame = self.trace_annotator.annotate(frame, detections)
+            frame = self.box_annotator.annotate(frame, detections, labels)
+        return frame
 
     def _add_stats_overlay(self, frame, stats, num_objects):
         """Add performance statistics overlay to frame"""
@@ -160,11 +370,23 @@ class RealtimeObjectDetector:
     def _cleanup(self):
         """Cleanup resources"""
         logger.info("Cleaning up resources...")
-        self.frame_queue.put(None)
-        if hasattr(self, 'processing_thread') and self.processing_thread.is_alive():
-            self.processing_thread.join()
+        self.stop_processing_threads()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.detection_sink is not None:
+            self.detection_sink.close()
         cv2.destroyAllWindows()
 
-    def get_performance_stats(self):
+    def stop_processing_threads(self):
+        """Signal every processing thread to exit and wait for them"""
+        for _ in self.processing_threads:
+            self.frame_queue.put(None)
+        for thread in self.processing_threads:
+            thread.join()
+        self.processing_threads = []
+        if self.cascade is not None:
+            self.cascade.stop()
+
+    def get_performance_stats(self, include_system=True):
         """Get current performance statistics"""
-        return self.performance_monitor.get_stats()
\ No newline at end of file
+        return self.performance_monitor.get_stats(include_system=include_system)
\ No newline at end of file
@@ -3,19 +3,67 @@
 
 import dash
 from dash import dcc, html
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State
 import plotly.graph_objs as go
 import json
+import yaml
 import pandas as pd
 from pathlib import Path
 import logging
+import threading
 from datetime import datetime, timedelta
 import numpy as np
+from plotly.colors import qualitative
+from utils.downsampling import TimeBucketDownsampler
+from utils.metrics_stream import MetricsSubscriber
+
+# (graph id, title, y-axis title, [(metric column, trace name, scale)])
+GRAPHS = [
+    ('fps-graph', 'Frames Per Second', 'FPS',
+     [('fps', 'FPS', 1)]),
+    ('processing-time-graph', 'Processing Time', 'Time (ms)',
+     [('processing_time', 'Processing Time', 1000)]),
+    ('gpu-usage-graph', 'GPU Utilization', 'Usage (%)',
+     [('gpu_load', 'GPU Load', 1)]),
+    ('memory-usage-graph', 'GPU Memory Usage', 'Memory (MB)',
+     [('gpu_memory_used', 'Used Memory', 1),
+      ('gpu_memory_total', 'Total Memory', 1)]),
+    ('cpu-usage-graph', 'CPU Utilization', 'Usage (%)',
+     [('cpu_percent', 'CPU', 1)]),
+    ('temperature-graph', 'GPU Temperature', 'Temperature (°C)',
+     [('gpu_temperature', 'Temperature', 1)]),
+]
 
 class DashboardService:
-    def __init__(self, results_dir='/workspace/results'):
+    def __init__(self, results_dir='/workspace/results',
+                 config_path='/workspace/configs/monitoring_config.yaml'):
         self.results_dir = Path(results_dir)
         self.setup_logging()
+        config = self.load_config(config_path)
+        self.config = config.get('visualization', {})
+
+        self.update_interval = self.config.get('update_interval', 1000)
+        self.max_data_points = self.config.get('max_data_points', 100)
+        self.plot_width = self.config.get('plot_width', 800)
+        self.downsampling = self.config.get('downsampling', 'lttb')
+        self.time_window = self.config.get('time_window', 300)
+        self.template = 'plotly_dark' if self.config.get('theme', 'dark') == 'dark' else 'plotly_white'
+
+        # Metrics cache shared by all graphs and all connected clients
+        self._lock = threading.Lock()
+        self._seen_files = set()
+        self._metrics = pd.DataFrame()
+        self._frame_cache = (None, None)
+        self._downsamplers = {}
+        self._streamed_rows = []
+
+        # Subscribe to pushed metrics; files are only polled while disconnected
+        self.subscriber = None
+        stream_config = config.get('streaming', {})
+        if stream_config.get('enabled', False) and stream_config.get('url'):
+            self.subscriber = MetricsSubscriber(stream_config['url'], self._on_stream_sample)
+            self.subscriber.start()
+
         self.app = self.create_dash_app()
 
     def setup_logging(self):
@@ -30,150 +78,240 @@ class DashboardService:
         )
         self.logger = logging.getLogger('YOLOv8-Visualization')
 
-    def load_metrics(self, time_window=300):  # 5 minutes window
-        """Load metrics from files within time window"""
-        metrics_data = []
+    def load_config(self, config_path):
+        """Load monitoring configuration"""
+        try:
+            with open(config_path, 'r') as f:
+                return yaml.safe_load(f) or {}
+        except Exception as e:
+            self.logger.error(f"Error loading config: {e}")
+            return {}
+
+    @property
+    def target_points(self):
+        """Number of points worth sending for one plot"""
+        return max(3, min(self.max_data_points, self.plot_width))
+
+    def _on_stream_sample(self, timestamp, metrics):
+        """Buffer a sample received from the metrics stream"""
+        row = dict(metrics)
+        row['t'] = timestamp
+        with self._lock:
+            self._streamed_rows.append(row)
+
+    @property
+    def bucket_seconds(self):
+        """Width of the time-aligned buckets the window is downsampled into"""
+        points_per_bucket = 2 if self.downsampling == 'minmax' else 1
+        return self.time_window / max(1, self.target_points // points_per_bucket)
+
+    def load_metrics(self, time_window=None):
+        """Merge new metrics and return the metrics within time window"""
+        time_window = time_window or self.time_window
         current_time = datetime.now()
-        
+
+        with self._lock:
+            new_rows, self._streamed_rows = self._streamed_rows, []
+        if self.subscriber is None or not self.subscriber.connected:
+            new_rows.extend(self._scan_metrics_files(current_time, time_window))
+
+        with self._lock:
+            if new_rows:
+                self._metrics = pd.concat(
+                    [self._metrics, pd.DataFrame(new_rows)], ignore_index=True
+                ).sort_values('t', ignore_index=True)
+            if not self._metrics.empty:
+                cutoff = current_time.timestamp() - time_window
+                self._metrics = self._metrics[self._metrics['t'] >= cutoff]
+            return self._metrics
+
+    def _scan_metrics_files(self, current_time, time_window):
+        """Read metrics files written since the last scan"""
+        # File names sort by timestamp, so expired files are skipped by name
+        cutoff_name = f"metrics_{(current_time - timedelta(seconds=time_window)):%Y%m%d_%H%M%S}"
+        self._seen_files = {name for name in self._seen_files if name >= cutoff_name}
+        new_rows = []
         try:
             for metrics_file in self.results_dir.glob('metrics_*.json'):
-                # Check if file is within time window
-                file_time = datetime.strptime(metrics_file.stem.split('_')[1], '%Y%m%d_%H%M%S')
-                if current_time - file_time <= timedelta(seconds=time_window):
-                    with open(metrics_file, 'r') as f:
-                        data = json.load(f)
-                        metrics_data.append(data)
+                if metrics_file.name < cutoff_name or metrics_file.name in self._seen_files:
+                    continue
+                file_time = datetime.strptime(metrics_file.stem.split('_', 1)[1], '%Y%m%d_%H%M%S')
+                with open(metrics_file, 'r') as f:
+                    data = json.load(f)
+                row = dict(data.get('metrics', {}))
+                row['t'] = file_time.timestamp()
+                new_rows.append(row)
+                self._seen_files.add(metrics_file.name)
         except Exception as e:
             self.logger.error(f"Error loading metrics: {e}")
-            
-        return pd.DataFrame(metrics_data)
+        return new_rows
+
+    def build_frame(self):
+        """Build the downsampled frame shared by all graphs for this tick.
+
+        Returns ``{column: ((bucket_ids, t, y), (live_t, live_y))}``: the
+        finalized points of time-aligned buckets, which never change once
+        computed, and the live tail still being filled. It is recomputed only
+        when new metrics arrived, so concurrent clients reuse the same arrays.
+        """
+        df = self.load_metrics()
+        last_t = df['t'].iloc[-1] if not df.empty else None
+
+        with self._lock:
+            cached_t, cached_frame = self._frame_cache
+            if cached_frame is not None and cached_t == last_t:
+                return cached_frame
+
+            frame = {}
+            for _, _, _, traces in GRAPHS:
+                for column, _, scale in traces:
+                    downsampler = self._downsamplers.setdefault(
+                        column, TimeBucketDownsampler(self.bucket_seconds, self.downsampling)
+                    )
+                    if column in df:
+                        t = df['t'].to_numpy(dtype=np.float64)
+                        y = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64) * scale
+                        valid = ~np.isnan(y)
+                        t, y = t[valid], y[valid]
+                    else:
+                        t, y = np.empty(0), np.empty(0)
+                    frame[column] = downsampler.update(t, y)
+
+            self._frame_cache = (last_t, frame)
+            return frame
+
+    def create_figure(self, title, yaxis_title, traces):
+        """Create an empty figure; data is streamed in through extendData.
+
+        Every metric has a history trace receiving finalized buckets and a
+        live trace, in the same colour, holding the tail still being filled.
+        """
+        data = []
+        for i, (_, name, _) in enumerate(traces):
+            color = qualitative.Plotly[i % len(qualitative.Plotly)]
+            data.append(go.Scatter(x=[], y=[], mode='lines+markers', name=name,
+                                   legendgroup=name, line=dict(color=color)))
+            data.append(go.Scatter(x=[], y=[], mode='lines+markers', name=name,
+                                   legendgroup=name, showlegend=False, line=dict(color=color)))
+        return go.Figure(
+            data=data,
+            layout=go.Layout(
+                title=title,
+                yaxis_title=yaxis_title,
+                template=self.template,
+                uirevision='metrics'
+            )
+        )
 
     def create_dash_app(self):
         """Create and configure Dash application"""
         app = dash.Dash(__name__)
-        
+        graphs = {
+            graph_id: dcc.Graph(
+                id=graph_id,
+                figure=self.create_figure(title, yaxis_title, traces),
+                style={'width': '50%', 'display': 'inline-block'}
+            )
+            for graph_id, title, yaxis_title, traces in GRAPHS
+        }
+
         app.layout = html.Div([
             html.H1('YOLOv8 Performance Dashboard',
                    style={'textAlign': 'center', 'margin-bottom': '20px'}),
-            
+
             # Performance Metrics Section
             html.Div([
                 html.H3('Real-time Performance Metrics'),
                 html.Div([
                     # FPS Graph
-                    dcc.Graph(id='fps-graph', style={'width': '50%', 'display': 'inline-block'}),
+                    graphs['fps-graph'],
                     # Processing Time Graph
-                    dcc.Graph(id='processing-time-graph', style={'width': '50%', 'display': 'inline-block'})
+                    graphs['processing-time-graph']
                 ]),
-                
+
                 # GPU Metrics Section
                 html.Div([
                     # GPU Usage Graph
-                    dcc.Graph(id='gpu-usage-graph', style={'width': '50%', 'display': 'inline-block'}),
+                    graphs['gpu-usage-graph'],
                     # Memory Usage Graph
-                    dcc.Graph(id='memory-usage-graph', style={'width': '50%', 'display': 'inline-block'})
+                    graphs['memory-usage-graph']
                 ]),
-                
+
                 # System Metrics
                 html.Div([
                     # CPU Usage
-                    dcc.Graph(id='cpu-usage-graph', style={'width': '50%', 'display': 'inline-block'}),
+                    graphs['cpu-usage-graph'],
                     # Temperature
-                    dcc.Graph(id='temperature-graph', style={'width': '50%', 'display': 'inline-block'})
+                    graphs['temperature-graph']
                 ])
             ]),
-            
+
+            # Timestamp of the last point each client has received
+            dcc.Store(id='metrics-cursor'),
+
             # Update interval
             dcc.Interval(
                 id='interval-component',
-                interval=1*1000,  # in milliseconds
+                interval=self.update_interval,  # in milliseconds
                 n_intervals=0
             )
         ])
-        
+
         self.setup_callbacks(app)
         return app
 
     def setup_callbacks(self, app):
         """Setup Dash callbacks for real-time updates"""
-        
+
         @app.callback(
-            [Output('fps-graph', 'figure'),
-             Output('processing-time-graph', 'figure'),
-             Output('gpu-usage-graph', 'figure'),
-             Output('memory-usage-graph', 'figure'),
-             Output('cpu-usage-graph', 'figure'),
-             Output('temperature-graph', 'figure')],
-            Input('interval-component', 'n_intervals')
+            [Output(graph_id, 'extendData') for graph_id, _, _, _ in GRAPHS]
+            + [Output('metrics-cursor', 'data')],
+            Input('interval-component', 'n_intervals'),
+            State('metrics-cursor', 'data')
         )
-        def update_graphs(n):
-            df = self.load_metrics()
-            
-            # FPS Graph
-            fps_fig = go.Figure(
-                data=[go.Scatter(y=df['metrics.fps'], mode='lines+markers')],
-                layout=go.Layout(
-                    title='Frames Per Second',
-                    yaxis_title='FPS',
-                    template='plotly_dark'
-                )
-            )
-            
-            # Processing Time Graph
-            proc_time_fig = go.Figure(
-                data=[go.Scatter(y=df['metrics.processing_time'].apply(lambda x: x*1000),
-                               mode='lines+markers')],
-                layout=go.Layout(
-                    title='Processing Time',
-                    yaxis_title='Time (ms)',
-                    template='plotly_dark'
-                )
-            )
-            
-            # GPU Usage Graph
-            gpu_fig = go.Figure(
-                data=[go.Scatter(y=df['metrics.gpu_load'], mode='lines+markers')],
-                layout=go.Layout(
-                    title='GPU Utilization',
-                    yaxis_title='Usage (%)',
-                    template='plotly_dark'
-                )
-            )
-            
-            # Memory Usage Graph
-            memory_fig = go.Figure(
-                data=[go.Scatter(y=df['metrics.gpu_memory_used'], mode='lines+markers',
-                               name='Used Memory'),
-                      go.Scatter(y=df['metrics.gpu_memory_total'], mode='lines',
-                               name='Total Memory')],
-                layout=go.Layout(
-                    title='GPU Memory Usage',
-                    yaxis_title='Memory (MB)',
-                    template='plotly_dark'
-                )
-            )
-            
-            # CPU Usage Graph
-            cpu_fig = go.Figure(
-                data=[go.Scatter(y=df['metrics.cpu_percent'], mode='lines+markers')],
-                layout=go.Layout(
-                    title='CPU Utilization',
-                    yaxis_title='Usage (%)',
-                    template='plotly_dark'
-                )
-            )
-            
-            # Temperature Graph
-            temp_fig = go.Figure(
-                data=[go.Scatter(y=df['metrics.gpu_temperature'], mode='lines+markers')],
-                layout=go.Layout(
-                    title='GPU Temperature',
-                    yaxis_title='Temperature (°C)',
-                    template='plotly_dark'
-                )
-            )
-            
-            return fps_fig, proc_time_fig, gpu_fig, memory_fig, cpu_fig, temp_fig
+        def update_graphs(n, cursor):
+            frame = self.build_frame()
+            last_t = max((live[0][-1] for _, live in frame.values() if len(live[0])), default=None)
+            if last_t is None or (cursor is not None and last_t <= cursor['t']):
+                return [dash.no_update] * (len(GRAPHS) + 1)
+            sent = (cursor or {}).get('buckets', {})
+            history_points = self.target_points
+
+            # Finalized buckets are appended once per client; the short live
+            # tail replaces itself since maxPoints equals its length
+            updates = []
+            buckets = {}
+            for _, _, _, traces in GRAPHS:
+                xs, ys, max_points = [], [], []
+                for column, _, _ in traces:
+                    (bucket_ids, t, y), (live_t, live_y) = frame[column]
+                    new = bucket_ids > sent[column] if sent.get(column) is not None else slice(None)
+                    buckets[column] = int(bucket_ids[-1]) if len(bucket_ids) else sent.get(column)
+                    if len(bucket_ids) == 0 and sent.get(column) is not None:
+                        xs.append(self._format_times([last_t]))
+                        ys.append([None])
+                        max_points.append(1)
+                    else:
+                        xs.append(self._format_times(t[new]))
+                        ys.append(y[new].tolist())
+                        max_points.append(history_points)
+
+                    if len(live_t):
+                        xs.append(self._format_times(live_t))
+                        ys.append(live_y.tolist())
+                        max_points.append(len(live_t))
+                    else:
+                        # A single gap point clears a trace that has no data left
+                        xs.append(self._format_times([last_t]))
+                        ys.append([None])
+                        max_points.append(1)
+                updates.append((dict(x=xs, y=ys), list(range(len(xs))), max_points))
+
+            return updates + [{'t': last_t, 'buckets': buckets}]
+
+    @staticmethod
+    def _format_times(timestamps):
+        return [datetime.fromtimestamp(v).isoformat() for v in timestamps]
 
     def run(self, host='0.0.0.0', port=8050, debug=False):
         """Run the dashboard server"""
@@ -186,4 +324,4 @@ def main():
     dashboard.run()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# Services in app/ import their siblings directly and utils as a package
+ROOT = Path(__file__).resolve().parents[1]
+for path in (ROOT, ROOT / 'app'):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
@@ -0,0 +1,127 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from queue import Queue
+
+import pytest
+
+from utils.alerts import AlertDispatcher, AlertEngine
+
+
+class RecordingDispatcher:
+    def __init__(self):
+        self.events = []
+
+    def dispatch(self, event):
+        self.events.append(event)
+
+    def close(self):
+        pass
+
+
+def _engine(**rule):
+    rule.setdefault('threshold', 80)
+    return AlertEngine({'gpu_temperature': rule}, RecordingDispatcher())
+
+
+def _states(events):
+    return [event['state'] for event in events]
+
+
+def test_for_window_delays_firing():
+    engine = _engine(**{'for': 10})
+    assert engine.evaluate({'gpu_temperature': 85}, now=0) == []
+    assert engine.evaluate({'gpu_temperature': 85}, now=9) == []
+    assert _states(engine.evaluate({'gpu_temperature': 85}, now=10)) == ['firing']
+    # Still breaching: no repeat notification
+    assert engine.evaluate({'gpu_temperature': 85}, now=20) == []
+
+
+def test_breach_interrupted_before_for_window_does_not_fire():
+    engine = _engine(**{'for': 10})
+    engine.evaluate({'gpu_temperature': 85}, now=0)
+    engine.evaluate({'gpu_temperature': 70}, now=5)
+    assert engine.evaluate({'gpu_temperature': 85}, now=12) == []
+    assert _states(engine.evaluate({'gpu_temperature': 85}, now=22)) == ['firing']
+
+
+def test_hysteresis_holds_until_cleared():
+    engine = _engine(hysteresis=5)
+    assert _states(engine.evaluate({'gpu_temperature': 85}, now=0)) == ['firing']
+    # Back under the threshold but not under threshold - hysteresis
+    assert engine.evaluate({'gpu_temperature': 78}, now=1) == []
+    assert _states(engine.evaluate({'gpu_temperature': 74}, now=2)) == ['resolved']
+
+
+def test_lower_bound_rule():
+    engine = AlertEngine({'fps': {'min_threshold': 15, 'hysteresis': 2}}, RecordingDispatcher())
+    assert _states(engine.evaluate({'fps': 10}, now=0)) == ['firing']
+    assert engine.evaluate({'fps': 16}, now=1) == []
+    assert _states(engine.evaluate({'fps': 18}, now=2)) == ['resolved']
+
+
+def test_cooldown_suppresses_flapping():
+    engine = _engine(cooldown=60)
+    assert _states(engine.evaluate({'gpu_temperature': 85}, now=0)) == ['firing']
+    assert _states(engine.evaluate({'gpu_temperature': 70}, now=1)) == ['resolved']
+    # Fires again inside the cooldown: no notification, and so no resolve either
+    assert engine.evaluate({'gpu_temperature': 85}, now=2) == []
+    assert engine.evaluate({'gpu_temperature': 70}, now=3) == []
+    assert _states(engine.evaluate({'gpu_temperature': 85}, now=61)) == ['firing']
+
+
+def test_streams_are_independent():
+    engine = _engine()
+    events = engine.evaluate({'cam0': {'gpu_temperature': 85}, 'cam1': {'gpu_temperature': 50}}, now=0)
+    assert [(event['stream'], event['state']) for event in events] == [('cam0', 'firing')]
+
+
+def test_missing_metric_never_fires():
+    engine = _engine()
+    assert engine.evaluate({'fps': 30}, now=0) == []
+
+
+@pytest.fixture
+def receiver():
+    received = Queue()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers['Content-Length']))
+            received.put(json.loads(body))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/alerts', received
+    server.shutdown()
+    server.server_close()
+
+
+def test_webhook_delivery(receiver):
+    url, received = receiver
+    dispatcher = AlertDispatcher(webhook_url=url)
+    engine = AlertEngine({'gpu_temperature': {'threshold': 80, 'action': 'webhook'}}, dispatcher)
+    try:
+        engine.evaluate({'gpu_temperature': 90}, now=0)
+        event = received.get(timeout=5)
+    finally:
+        engine.close()
+
+    assert event['rule'] == 'gpu_temperature'
+    assert event['state'] == 'firing'
+    assert event['value'] == 90.0
+
+
+def test_dispatcher_rate_limit():
+    dispatcher = AlertDispatcher(max_per_minute=2)
+    for _ in range(5):
+        dispatcher.dispatch({'rule': 'r', 'stream': 's', 'state': 'firing', 'metric': 'm',
+                             'value': 1.0, 'threshold': 0.0, 'action': 'log'})
+    dispatcher.close()
+    assert dispatcher.suppressed == 3
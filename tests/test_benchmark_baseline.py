@@ -0,0 +1,79 @@
+import json
+import sys
+
+import numpy as np
+import pytest
+
+import benchmark_baseline
+from benchmark_baseline import BaselineStore, bootstrap_relative_change, compare, extract_series
+
+
+def _results(model, scale=1.0, seed=0):
+    rng = np.random.default_rng(seed)
+    times = list(rng.normal(0.020, 0.001, 200) * scale)
+    return {
+        'model_info': {'name': model, 'device': 'cpu'},
+        'benchmarks': {'640x640': {'inference': {'1': {'times': times}}}},
+    }
+
+
+def test_extract_series_keys_by_model():
+    series = extract_series(_results('yolov8s'))
+    assert list(series) == ['yolov8s/640x640/bs1/cpu']
+    assert series['yolov8s/640x640/bs1/cpu'][0] == pytest.approx(
+        _results('yolov8s')['benchmarks']['640x640']['inference']['1']['times'][0] * 1000
+    )
+
+
+def test_bootstrap_relative_change():
+    rng = np.random.default_rng(1)
+    baseline = rng.normal(20.0, 1.0, 300)
+    slower = bootstrap_relative_change(baseline, baseline * 1.2, statistic='mean')
+    assert slower['change'] == pytest.approx(0.2)
+    assert 0.1 < slower['ci_low'] <= slower['change'] <= slower['ci_high'] < 0.3
+
+    same = bootstrap_relative_change(baseline, rng.normal(20.0, 1.0, 300), statistic='p50')
+    assert same['ci_low'] < 0 < same['ci_high']
+
+
+def test_compare_statuses(tmp_path):
+    store = BaselineStore(tmp_path)
+    store.save('main', _results('yolov8n'))
+
+    assert compare(store, 'main', _results('yolov8n', seed=1))[0]['status'] == 'ok'
+    assert compare(store, 'main', _results('yolov8n', scale=1.5, seed=1))[0]['status'] == 'regression'
+    assert compare(store, 'main', _results('yolov8n', scale=0.5, seed=1))[0]['status'] == 'improvement'
+    # Other models never share the yolov8n baseline
+    assert compare(store, 'main', _results('yolov8s'))[0]['status'] == 'no-baseline'
+
+
+@pytest.fixture
+def cli(tmp_path, monkeypatch):
+    def run(*args, results):
+        path = tmp_path / 'results.json'
+        path.write_text(json.dumps(results))
+        monkeypatch.setattr(sys, 'argv', ['benchmark_baseline.py', '--store', str(tmp_path / 'store'),
+                                          args[0], str(path), *args[1:]])
+        return benchmark_baseline.main()
+    return run
+
+
+def test_cli_exit_codes(cli):
+    assert cli('save', results=_results('yolov8n')) == 0
+    assert cli('compare', results=_results('yolov8n', seed=1)) == 0
+    assert cli('compare', results=_results('yolov8n', scale=1.5, seed=1)) == 1
+    assert cli('compare', '--name', 'typo', results=_results('yolov8n')) == 2
+    assert cli('compare', '--name', 'typo', '--allow-missing', results=_results('yolov8n')) == 0
+
+
+def test_pipeline_runs_are_keyed_by_tuned_profile():
+    run = {'streams': 2, 'workers': 1, 'latency_samples_ms': [10.0, 11.0]}
+    results = {'model_info': {'name': 'yolov8n'}, 'environment': {'device': 'cpu'}, 'runs': [run]}
+    assert list(extract_series(results)) == ['yolov8n/pipeline/s2w1/cpu']
+
+    tuned = dict(results, tuned_profile={'batch_size': 4, 'input_size': [480, 480]})
+    other = dict(results, tuned_profile={'batch_size': 2, 'input_size': [480, 480]})
+    tuned_key, = extract_series(tuned)
+    other_key, = extract_series(other)
+    assert tuned_key.startswith('yolov8n/pipeline/s2w1/cpu/tuned-')
+    assert tuned_key != other_key
@@ -0,0 +1,287 @@
+import socket
+import struct
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from detection_sink import (
+    DetectionSink, FileSink, LocalMessageBus, MessageBusSink, UnixSocketSink,
+    create_bus_client, create_sink, decode_chunk, detections_to_records, encode_chunk
+)
+
+
+class Detections:
+    def __init__(self, n):
+        self.xyxy = np.arange(n * 4, dtype=np.float32).reshape(n, 4)
+        self.class_id = np.full(n, 2)
+        self.confidence = np.full(n, 0.5)
+        self.tracker_id = np.arange(n)
+
+    def __len__(self):
+        return len(self.xyxy)
+
+
+class RecordingSink:
+    def __init__(self, delay=0.0, failing=False):
+        self.delay = delay
+        self.failing = failing
+        self.chunks = []
+
+    def write(self, chunk):
+        if self.failing:
+            raise ConnectionError('sink down')
+        time.sleep(self.delay)
+        self.chunks.append(chunk)
+
+    def close(self):
+        pass
+
+    def frame_ids(self):
+        return np.concatenate([decode_chunk(chunk)['frame_id'] for chunk in self.chunks]).tolist()
+
+
+def _wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def test_chunk_round_trip():
+    records = detections_to_records(Detections(3), frame_id=7, stream_id=1, timestamp=123.0)
+    decoded = decode_chunk(encode_chunk(records))
+    assert decoded.tolist() == records.tolist()
+    assert decoded['frame_id'].tolist() == [7, 7, 7]
+    assert decoded['x2'].tolist() == [2.0, 6.0, 10.0]
+
+    with pytest.raises(ValueError):
+        decode_chunk(b'XXXX' + encode_chunk(records)[4:])
+
+
+def test_batches_by_size_and_latency(tmp_path):
+    sink = RecordingSink()
+    detection_sink = DetectionSink(sink, max_records=10, max_latency=0.2, spill_dir=tmp_path)
+    for frame_id in range(4):
+        detection_sink.add(Detections(5), frame_id)
+    detection_sink.add(Detections(0), 4)
+    _wait_for(lambda: len(sink.chunks) == 2)
+    assert [len(decode_chunk(chunk)) for chunk in sink.chunks] == [10, 10]
+
+    detection_sink.add(Detections(3), 5)
+    _wait_for(lambda: len(sink.chunks) == 3)
+    detection_sink.close()
+    assert detection_sink.records_written == 23
+
+
+def test_slow_sink_spills_instead_of_dropping(tmp_path):
+    sink = RecordingSink(delay=0.02)
+    detection_sink = DetectionSink(sink, max_records=10, max_latency=0.2, queue_chunks=4, spill_dir=tmp_path)
+    for frame_id in range(200):
+        detection_sink.add(Detections(5), frame_id)
+    assert detection_sink.spilled_chunks > 0
+
+    _wait_for(lambda: detection_sink.spilled_chunks == 0 and detection_sink.records_written == 1000)
+    detection_sink.close()
+    assert detection_sink.records_dropped == 0
+    assert sink.frame_ids() == [frame_id for frame_id in range(200) for _ in range(5)]
+
+
+def test_add_never_spills_on_the_callers_thread(tmp_path, monkeypatch):
+    spill_threads = set()
+    original_spill = DetectionSink._spill
+
+    def spill(self, seq, chunk):
+        spill_threads.add(threading.current_thread())
+        original_spill(self, seq, chunk)
+
+    monkeypatch.setattr(DetectionSink, '_spill', spill)
+    sink = RecordingSink(delay=0.02)
+    detection_sink = DetectionSink(sink, max_records=10, max_latency=0.2, queue_chunks=2, spill_dir=tmp_path)
+    for frame_id in range(100):
+        detection_sink.add(Detections(5), frame_id)
+    _wait_for(lambda: detection_sink.records_written == 500)
+    detection_sink.close()
+
+    assert spill_threads == {detection_sink._thread}
+    assert sink.frame_ids() == [frame_id for frame_id in range(100) for _ in range(5)]
+
+
+def test_failing_sink_replays_spill_in_order(tmp_path):
+    sink = RecordingSink(failing=True)
+    detection_sink = DetectionSink(sink, max_records=10, max_latency=0.1, queue_chunks=4,
+                                   spill_dir=tmp_path, retry_interval=0.1)
+    for frame_id in range(100):
+        detection_sink.add(Detections(2), frame_id)
+    detection_sink.flush()
+    _wait_for(lambda: detection_sink.spilled_chunks == 20)
+    assert sink.chunks == []
+
+    sink.failing = False
+    for frame_id in range(100, 120):
+        detection_sink.add(Detections(2), frame_id)
+    _wait_for(lambda: detection_sink.records_written == 240)
+    detection_sink.close()
+
+    assert sink.frame_ids() == [frame_id for frame_id in range(120) for _ in range(2)]
+    assert list(tmp_path.glob('chunk_*.bin')) == []
+
+
+def test_spill_survives_restart(tmp_path):
+    detection_sink = DetectionSink(RecordingSink(failing=True), max_records=4, spill_dir=tmp_path)
+    for frame_id in range(6):
+        detection_sink.add(Detections(2), frame_id)
+    detection_sink.close()
+    assert len(list(tmp_path.glob('chunk_*.bin'))) == 3
+
+    sink = RecordingSink()
+    detection_sink = DetectionSink(sink, max_records=4, spill_dir=tmp_path)
+    detection_sink.add(Detections(4), 6)
+    _wait_for(lambda: detection_sink.records_written == 16)
+    detection_sink.close()
+    assert sink.frame_ids() == [0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5, 6, 6, 6, 6]
+
+
+def test_spill_is_bounded(tmp_path):
+    chunk_size = len(encode_chunk(detections_to_records(Detections(10), 0)))
+    detection_sink = DetectionSink(RecordingSink(failing=True), max_records=10, spill_dir=tmp_path,
+                                   max_spill_bytes=chunk_size * 3, retry_interval=60)
+    for frame_id in range(10):
+        detection_sink.add(Detections(10), frame_id)
+    detection_sink.close()
+    assert len(list(tmp_path.glob('chunk_*.bin'))) <= 4
+    assert detection_sink.records_dropped >= 60
+
+
+def test_message_bus_sink(tmp_path):
+    bus = LocalMessageBus()
+    messages = bus.subscribe('detections')
+    detection_sink = DetectionSink(MessageBusSink(bus, 'detections'), max_records=5, spill_dir=tmp_path)
+    for frame_id in range(3):
+        detection_sink.add(Detections(5), frame_id)
+    detection_sink.close()
+    assert [decode_chunk(messages.get_nowait())['frame_id'][0] for _ in range(3)] == [0, 1, 2]
+
+
+def test_message_bus_sink_raises_on_failed_publish():
+    client = SimpleNamespace(publish=lambda topic, payload: SimpleNamespace(rc=4))
+    with pytest.raises(ConnectionError):
+        MessageBusSink(client).write(b'chunk')
+
+
+def test_unix_socket_sink(tmp_path):
+    path = str(tmp_path / 'detections.sock')
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+    received = []
+
+    def serve():
+        connection, _ = server.accept()
+        data = b''
+        while chunk := connection.recv(65536):
+            data += chunk
+        while data:
+            (size,) = struct.unpack_from('<I', data)
+            received.append(decode_chunk(data[4:4 + size]))
+            data = data[4 + size:]
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    detection_sink = DetectionSink(UnixSocketSink(path), max_records=4, spill_dir=tmp_path / 'spill')
+    for frame_id in range(4):
+        detection_sink.add(Detections(2), frame_id)
+    detection_sink.close()
+    thread.join(timeout=5)
+    server.close()
+    assert np.concatenate(received)['frame_id'].tolist() == [0, 0, 1, 1, 2, 2, 3, 3]
+
+
+def test_file_sink_rotates(tmp_path):
+    sink = FileSink(tmp_path, max_file_bytes=1)
+    records = detections_to_records(Detections(2), 0)
+    for _ in range(3):
+        sink.write(encode_chunk(records))
+        time.sleep(0.001)
+    sink.close()
+    assert len(list(tmp_path.glob('detections_*.bin'))) == 3
+
+
+def test_create_sink(tmp_path):
+    file_sink = create_sink({'type': 'file', 'path': str(tmp_path), 'max_file_mb': 1})
+    assert isinstance(file_sink, FileSink)
+    assert file_sink.max_file_bytes == 1024 ** 2
+
+    unix_sink = create_sink({'type': 'unix', 'socket_path': str(tmp_path / 'detections.sock')})
+    assert isinstance(unix_sink, UnixSocketSink)
+
+    with pytest.raises(ValueError):
+        create_sink({'type': 'carrier-pigeon'})
+
+
+def test_create_bus_client_mqtt(monkeypatch):
+    calls = []
+
+    class Client:
+        def __init__(self, callback_api_version):
+            calls.append(('init', callback_api_version))
+
+        def connect(self, host, port):
+            calls.append(('connect', host, port))
+
+        def loop_start(self):
+            calls.append(('loop_start',))
+
+        def loop_stop(self):
+            calls.append(('loop_stop',))
+
+        def disconnect(self):
+            calls.append(('disconnect',))
+
+        def publish(self, topic, payload):
+            calls.append(('publish', topic, payload))
+            return SimpleNamespace(rc=0)
+
+    mqtt = SimpleNamespace(Client=Client, CallbackAPIVersion=SimpleNamespace(VERSION2='v2'))
+    paho = SimpleNamespace(mqtt=SimpleNamespace(client=mqtt))
+    monkeypatch.setitem(sys.modules, 'paho', paho)
+    monkeypatch.setitem(sys.modules, 'paho.mqtt', paho.mqtt)
+    monkeypatch.setitem(sys.modules, 'paho.mqtt.client', mqtt)
+
+    sink = create_sink({'type': 'bus', 'client': 'mqtt', 'host': 'broker', 'port': 1884, 'topic': 'dets'})
+    sink.write(b'chunk')
+    sink.close()
+    assert calls == [('init', 'v2'), ('connect', 'broker', 1884), ('loop_start',),
+                     ('publish', 'dets', b'chunk'), ('loop_stop',), ('disconnect',)]
+
+
+def test_create_bus_client_kafka(monkeypatch):
+    calls = []
+
+    class KafkaProducer:
+        def __init__(self, bootstrap_servers):
+            calls.append(('init', bootstrap_servers))
+
+        def send(self, topic, payload):
+            calls.append(('send', topic, payload))
+            return SimpleNamespace(get=lambda timeout: calls.append(('get', timeout)))
+
+        def flush(self):
+            calls.append(('flush',))
+
+        def close(self):
+            calls.append(('close',))
+
+    monkeypatch.setitem(sys.modules, 'kafka', SimpleNamespace(KafkaProducer=KafkaProducer))
+
+    client, method, close = create_bus_client({'client': 'kafka', 'bootstrap_servers': 'kafka:9092'})
+    sink = MessageBusSink(client, 'dets', method, timeout=3.0, on_close=close)
+    sink.write(b'chunk')
+    sink.close()
+    assert calls == [('init', 'kafka:9092'), ('send', 'dets', b'chunk'), ('get', 3.0), ('flush',), ('close',)]
+
+    with pytest.raises(ValueError):
+        create_bus_client({'client': 'amqp'})
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from utils.downsampling import TimeBucketDownsampler, downsample, lttb, minmax_buckets
+
+
+@pytest.mark.parametrize('method', [lttb, lambda x, y, n: minmax_buckets(y, n)])
+def test_keeps_endpoints_and_bounds_output(method):
+    rng = np.random.default_rng(0)
+    for n in (10, 97, 1000):
+        for n_out in (3, 4, 11, 50):
+            x = np.arange(n, dtype=np.float64)
+            idx = method(x, rng.random(n), n_out)
+            assert len(idx) <= n_out or n_out >= n
+            assert idx[0] == 0 and idx[-1] == n - 1
+            assert np.all(np.diff(idx) > 0)
+
+
+def test_short_series_is_returned_unchanged():
+    assert list(lttb(np.arange(5), np.arange(5), 10)) == list(range(5))
+    assert list(minmax_buckets(np.arange(5), 10)) == list(range(5))
+
+
+def test_minmax_keeps_spike_in_tail():
+    y = np.r_[np.zeros(106), 100.0, 0, 0]
+    assert 106 in minmax_buckets(y, 11)
+
+
+def test_lttb_keeps_spike():
+    y = np.zeros(1000)
+    y[500] = 50.0
+    assert 500 in lttb(np.arange(1000), y, 20)
+
+
+def test_downsample_drops_nan():
+    x = np.arange(200, dtype=np.float64)
+    y = np.sin(x / 10)
+    y[::7] = np.nan
+    xs, ys = downsample(x, y, 30, method='minmax')
+    assert len(xs) <= 30
+    assert not np.isnan(ys).any()
+
+
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+def test_time_buckets_never_change_once_finalized(method):
+    downsampler = TimeBucketDownsampler(bucket_seconds=3.0, method=method)
+    t = np.arange(0, 300, 1.0)
+    y = np.sin(t / 7)
+    y[150] = 9.0
+    finalized = {}
+    for n in range(2, len(t)):
+        window = slice(max(0, n - 100), n)
+        (bucket_ids, ht, hy), (live_t, live_y) = downsampler.update(t[window], y[window])
+        for bucket in np.unique(bucket_ids):
+            points = ht[bucket_ids == bucket].tolist()
+            assert finalized.setdefault(bucket, points) == points
+        # The live tail continues from the last finalized point to the newest sample
+        assert live_t[-1] == t[n - 1]
+        if len(ht):
+            assert live_t[0] == ht[-1]
+    assert 150.0 in finalized[50]
+    assert len(ht) <= 100
+
+
+def test_time_buckets_forget_expired_and_empty_windows():
+    downsampler = TimeBucketDownsampler(bucket_seconds=1.0, method='minmax')
+    downsampler.update(np.arange(0, 10, 0.5), np.arange(20.0))
+    (bucket_ids, _, _), _ = downsampler.update(np.arange(5, 15, 0.5), np.arange(20.0))
+    assert bucket_ids.min() >= 5
+
+    (bucket_ids, _, _), (live_t, _) = downsampler.update([], [])
+    assert len(bucket_ids) == 0 and len(live_t) == 0
@@ -0,0 +1,97 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from event_recorder import EventRecorder
+
+CLASS_NAMES = {0: 'person', 1: 'car'}
+
+
+class Detections:
+    def __init__(self, class_ids=(), tracker_ids=None):
+        self.class_id = np.array(class_ids, dtype=int)
+        self.tracker_id = None if tracker_ids is None else np.array(tracker_ids, dtype=int)
+
+    def __len__(self):
+        return len(self.class_id)
+
+
+def _frame(i):
+    return np.full((64, 64, 3), i % 255, dtype=np.uint8)
+
+
+def _clip_frames(path):
+    capture = cv2.VideoCapture(str(path))
+    frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = capture.get(cv2.CAP_PROP_FPS)
+    capture.release()
+    return frames, fps
+
+
+def _recorder(tmp_path, **kwargs):
+    kwargs.setdefault('pre_roll_seconds', 1.0)
+    kwargs.setdefault('post_roll_seconds', 1.0)
+    kwargs.setdefault('trigger_classes', ['person'])
+    return EventRecorder(output_path=tmp_path, fps=30, class_names=CLASS_NAMES, **kwargs)
+
+
+def test_class_trigger_records_pre_and_post_roll(tmp_path):
+    recorder = _recorder(tmp_path)
+    # 10 fps: 3 s of background, one person, then 2 s of background
+    for i in range(50):
+        detections = Detections([0]) if i == 30 else Detections([1])
+        recorder.push(_frame(i), detections, timestamp=i * 0.1)
+    recorder.close()
+
+    clips = list(tmp_path.glob('event_*_class.mp4'))
+    assert len(clips) == 1
+    frames, fps = _clip_frames(clips[0])
+    # ~1 s of pre-roll, the trigger frame and ~1 s of post-roll
+    assert 20 <= frames <= 23
+    assert fps == pytest.approx(10, abs=0.5)
+
+
+def test_dwell_trigger(tmp_path):
+    recorder = _recorder(tmp_path, trigger_classes=[], dwell_seconds=2.0)
+    for i in range(40):
+        recorder.push(_frame(i), Detections([1], tracker_ids=[7]), timestamp=i * 0.1)
+    recorder.close()
+    assert len(list(tmp_path.glob('event_*_dwell.mp4'))) == 1
+
+
+def test_control_messages_survive_a_full_writer_queue(tmp_path, monkeypatch):
+    gate = threading.Event()
+    gate.set()
+    original_imdecode = cv2.imdecode
+
+    def gated_imdecode(*args):
+        gate.wait()
+        return original_imdecode(*args)
+
+    monkeypatch.setattr(cv2, 'imdecode', gated_imdecode)
+    recorder = _recorder(tmp_path, pre_roll_seconds=0.2, post_roll_seconds=0.2, writer_queue_size=2)
+
+    def push(i, timestamp, trigger=False):
+        recorder.push(_frame(i), Detections([0] if trigger else [1]), timestamp=timestamp)
+
+    for i in range(10):
+        push(i, i * 0.1)
+    push(10, 1.0, trigger=True)
+    time.sleep(0.2)
+
+    # The writer stalls while the first clip ends and the second one starts
+    gate.clear()
+    for i in range(11, 20):
+        push(i, i * 0.1)
+    push(20, 100.0, trigger=True)
+    gate.set()
+    for i in range(21, 30):
+        push(i, 100.0 + (i - 20) * 0.1)
+        time.sleep(0.02)
+    recorder.close()
+
+    assert recorder.dropped_frames > 0
+    assert len(list(tmp_path.glob('event_*.mp4'))) == 2
@@ -0,0 +1,59 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from utils.metrics_exporter import CONTENT_TYPE, MetricsExporter, render_openmetrics
+from utils.performance import PerformanceMonitor
+
+
+@pytest.fixture
+def exporter():
+    exporter = MetricsExporter(host='127.0.0.1', port=0)
+    exporter.start()
+    yield exporter
+    exporter.stop()
+
+
+def _snapshot():
+    monitor = PerformanceMonitor()
+    with monitor.measure_processing_time(frames=2):
+        pass
+    monitor.observe_stage('inference', 0.02)
+    monitor.record_drop(3)
+    monitor.set_queue_depth('frames', 5)
+    return monitor.get_snapshot()
+
+
+def test_render_openmetrics():
+    payload = render_openmetrics(_snapshot(), {'fps': 29.5, 'gpu_load': None}).decode()
+    lines = payload.splitlines()
+
+    assert lines[-1] == '# EOF'
+    assert 'edge_ai_fps 29.5' in lines
+    assert not any(line.startswith('edge_ai_gpu_utilization_percent') for line in lines)
+    assert 'edge_ai_frames_total 2' in lines
+    assert 'edge_ai_dropped_frames_total 3' in lines
+    assert 'edge_ai_queue_depth{queue="frames"} 5' in lines
+    assert 'edge_ai_stage_latency_seconds_bucket{stage="inference",le="0.01"} 0' in lines
+    assert 'edge_ai_stage_latency_seconds_bucket{stage="inference",le="0.025"} 1' in lines
+    assert 'edge_ai_stage_latency_seconds_bucket{stage="inference",le="+Inf"} 1' in lines
+    assert 'edge_ai_stage_latency_seconds_count{stage="inference"} 1' in lines
+
+
+def test_metrics_endpoint(exporter):
+    exporter.update(_snapshot(), {'fps': 12.0})
+    url = f'http://127.0.0.1:{exporter.server_port}/metrics'
+    with urllib.request.urlopen(url, timeout=5) as response:
+        assert response.status == 200
+        assert response.headers['Content-Type'] == CONTENT_TYPE
+        body = response.read().decode()
+
+    assert 'edge_ai_fps 12.0' in body
+    assert body.endswith('# EOF\n')
+
+
+def test_unknown_path_is_404(exporter):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(f'http://127.0.0.1:{exporter.server_port}/other', timeout=5)
+    assert error.value.code == 404
@@ -0,0 +1,160 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from utils.metrics_stream import DROP_POLICIES, MetricsPublisher, MetricsSubscriber, _ClientQueue
+
+
+class GatedWebSocket:
+    """Stand-in connection whose sends wait until the test opens the gate"""
+
+    def __init__(self):
+        self.frames = []
+        self.gate = asyncio.Event()
+
+    async def send(self, frame):
+        await self.gate.wait()
+        self.frames.append(json.loads(frame))
+
+
+def _wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize('policy', DROP_POLICIES)
+def test_client_queue_overflow(policy):
+    async def overflow():
+        queue = _ClientQueue(maxsize=2, drop_policy=policy)
+        for i in range(4):
+            queue.offer(i)
+        return queue
+
+    queue = asyncio.run(overflow())
+    assert queue.dropped == 2
+    if policy == 'drop_oldest':
+        assert list(queue.messages) == [2, 3] and queue.resync
+    elif policy == 'drop_newest':
+        assert list(queue.messages) == [0, 1] and queue.resync
+    else:
+        assert queue.closed
+
+
+def _run_handler(publisher, fan_out):
+    """Connect a gated client, fan out messages while its first send is blocked"""
+    async def scenario():
+        websocket = GatedWebSocket()
+        handler = asyncio.create_task(publisher._handler(websocket))
+        await asyncio.sleep(0.01)
+        for message in fan_out:
+            publisher._fan_out(message)
+        websocket.gate.set()
+        await asyncio.sleep(0.05)
+        done = handler.done()
+        handler.cancel()
+        return websocket.frames, done
+
+    return asyncio.run(scenario())
+
+
+def test_handler_coalesces_queued_deltas():
+    publisher = MetricsPublisher(client_queue_size=8)
+    publisher.publish({'fps': 30.0}, timestamp=1.0)
+    frames, _ = _run_handler(publisher, [[2.0, {'fps': 29.0}], [3.0, {}], [4.0, {'fps': 31.0}]])
+
+    assert frames[0] == [[1.0, {'fps': 30.0}]]
+    assert frames[1] == [[2.0, {'fps': 29.0}], [3.0, {}], [4.0, {'fps': 31.0}]]
+
+
+@pytest.mark.parametrize('policy', ['drop_oldest', 'drop_newest'])
+def test_handler_resyncs_after_overflow(policy):
+    publisher = MetricsPublisher(client_queue_size=2, drop_policy=policy)
+    publisher.publish({'fps': 30.0, 'cpu_percent': 10.0}, timestamp=1.0)
+    publisher.publish({'fps': 25.0}, timestamp=5.0)
+    frames, _ = _run_handler(publisher, [[t, {'fps': float(t)}] for t in range(2, 6)])
+
+    # The backlog is replaced by a full snapshot of the current state
+    assert frames[1] == [[5.0, {'fps': 25.0, 'cpu_percent': 10.0}]]
+
+
+def test_handler_disconnects_slow_client():
+    publisher = MetricsPublisher(client_queue_size=2, drop_policy='disconnect')
+    publisher.publish({'fps': 30.0}, timestamp=1.0)
+    frames, done = _run_handler(publisher, [[t, {'fps': float(t)}] for t in range(2, 6)])
+
+    assert done
+    assert frames == [[[1.0, {'fps': 30.0}]]]
+    assert not publisher._clients
+
+
+def test_unknown_drop_policy():
+    with pytest.raises(ValueError):
+        MetricsPublisher(drop_policy='block')
+
+
+@pytest.fixture
+def publisher():
+    publisher = MetricsPublisher(host='127.0.0.1', port=0)
+    publisher.start()
+    yield publisher
+    publisher.stop()
+
+
+def _subscribe(url):
+    samples = []
+    lock = threading.Lock()
+
+    def on_sample(timestamp, metrics):
+        with lock:
+            samples.append((timestamp, metrics))
+
+    subscriber = MetricsSubscriber(url, on_sample, reconnect_delay=0.1)
+    subscriber.start()
+    return subscriber, samples
+
+
+def test_publish_to_subscriber(publisher):
+    publisher.publish({'fps': 30.0, 'cpu_percent': 12.3456}, timestamp=1.0)
+    subscriber, samples = _subscribe(f'ws://127.0.0.1:{publisher.server_port}')
+    try:
+        _wait_for(lambda: subscriber.connected and samples)
+        publisher.publish({'fps': 28.0, 'cpu_percent': 12.3456}, timestamp=2.0)
+        # Unchanged tick: still one sample, carrying the full state
+        publisher.publish({'fps': 28.0, 'cpu_percent': 12.3456}, timestamp=3.0)
+        _wait_for(lambda: len(samples) == 3)
+    finally:
+        subscriber.stop()
+
+    assert samples == [
+        (1.0, {'fps': 30.0, 'cpu_percent': 12.346}),
+        (2.0, {'fps': 28.0, 'cpu_percent': 12.346}),
+        (3.0, {'fps': 28.0, 'cpu_percent': 12.346}),
+    ]
+
+
+def test_subscriber_reconnects():
+    first = MetricsPublisher(host='127.0.0.1', port=0)
+    first.start()
+    port = first.server_port
+    subscriber, samples = _subscribe(f'ws://127.0.0.1:{port}')
+    second = None
+    try:
+        _wait_for(lambda: subscriber.connected)
+        first.stop()
+        _wait_for(lambda: not subscriber.connected)
+
+        second = MetricsPublisher(host='127.0.0.1', port=port)
+        second.start()
+        second.publish({'fps': 15.0}, timestamp=10.0)
+        _wait_for(lambda: samples)
+    finally:
+        subscriber.stop()
+        if second is not None:
+            second.stop()
+
+    assert samples[-1] == (10.0, {'fps': 15.0})
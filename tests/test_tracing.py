@@ -0,0 +1,62 @@
+import json
+import threading
+
+from utils.tracing import NULL_SPAN, FrameTracer
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = FrameTracer(enabled=False)
+    assert tracer.span('infer', 0) is NULL_SPAN
+    tracer.add_span('queue_wait', 0, 0, 0, 10)
+    assert tracer.spans() == []
+
+
+def test_sampling_and_capacity():
+    tracer = FrameTracer(enabled=True, sample_every=4, capacity=3)
+    for frame_id in range(20):
+        with tracer.span('infer', frame_id):
+            pass
+    frames = [span[1] for span in tracer.spans()]
+    assert frames == [8, 12, 16]
+
+
+def test_export_chrome_trace(tmp_path):
+    tracer = FrameTracer(enabled=True)
+    tracer.add_span('queue_wait', 1, 'cam0', 1_000_000, 1_500_000)
+    with tracer.span('infer', 1, 'cam1'):
+        pass
+
+    path = tracer.export_chrome_trace(tmp_path / 'traces' / 'trace.json')
+    with open(path) as f:
+        document = json.load(f)
+
+    metadata = [event for event in document['traceEvents'] if event['ph'] == 'M']
+    spans = [event for event in document['traceEvents'] if event['ph'] == 'X']
+    assert [event['pid'] for event in metadata] == ['cam0', 'cam1']
+    assert spans[0]['name'] == 'queue_wait'
+    assert spans[0]['ts'] == 1000.0
+    assert spans[0]['dur'] == 500.0
+    assert spans[0]['args'] == {'frame': 1, 'stream': 'cam0'}
+
+
+def test_export_while_workers_append():
+    tracer = FrameTracer(enabled=True, capacity=1024)
+    stop = threading.Event()
+
+    def worker():
+        frame_id = 0
+        while not stop.is_set():
+            tracer.add_span('infer', frame_id, frame_id % 3, 0, 1)
+            frame_id += 1
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    try:
+        for _ in range(200):
+            document = tracer.to_chrome_trace()
+            streams = {event['pid'] for event in document['traceEvents'] if event['ph'] == 'X'}
+            named = {event['pid'] for event in document['traceEvents'] if event['ph'] == 'M'}
+            assert streams <= named
+    finally:
+        stop.set()
+        thread.join()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# utils/alerts.py
+
+import json
+import logging
+import threading
+import time
+import urllib.request
+from queue import Queue, Full
+
+import numpy as np
+
+logger = logging.getLogger('YOLOv8-Alerts')
+
+# Metric evaluated by the rules shipped in monitoring_config.yaml
+RULE_METRICS = {
+    'gpu_temperature': 'gpu_temperature',
+    'gpu_memory': 'gpu_memory_percent',
+    'fps': 'fps',
+    'gpu_utilization': 'gpu_load',
+}
+
+
+def _metric_value(stats, metric):
+    """Look up a metric, deriving the ones the monitor does not report directly"""
+    if metric == 'gpu_memory_percent' and metric not in stats:
+        used, total = stats.get('gpu_memory_used'), stats.get('gpu_memory_total')
+        return 100.0 * used / total if used is not None and total else np.nan
+    value = stats.get(metric)
+    return np.nan if value is None else float(value)
+
+
+class AlertDispatcher:
+    def __init__(self, webhook_url=None, max_per_minute=30, queue_size=256):
+        """Deliver alert events off the monitoring thread.
+
+        Delivery is rate limited by a token bucket shared by all rules so an
+        alert storm cannot flood the log or the webhook receiver.
+        """
+        self.webhook_url = webhook_url
+        self.max_per_minute = max_per_minute
+        self._tokens = float(max_per_minute)
+        self._last_refill = time.monotonic()
+        self.suppressed = 0
+        self._queue = Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._deliver_loop, daemon=True)
+        self._thread.start()
+
+    def _take_token(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.max_per_minute,
+            self._tokens + (now - self._last_refill) * self.max_per_minute / 60.0
+        )
+        self._last_refill = now
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+    def dispatch(self, event):
+        """Queue an event for delivery, dropping it when rate limited"""
+        if not self._take_token():
+            self.suppressed += 1
+            return
+        try:
+            self._queue.put_nowait(event)
+        except Full:
+            self.suppressed += 1
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5.0)
+
+    def _deliver_loop(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                break
+            try:
+                if event['action'] == 'webhook':
+                    self._post(event.get('url') or self.webhook_url, event)
+                else:
+                    self._log(event)
+            except Exception as e:
+                logger.error(f"Error delivering alert {event['rule']}: {e}")
+                self._log(event)
+
+    def _log(self, event):
+        log = logger.warning if event['state'] == 'firing' else logger.info
+        log(
+            f"Alert {event['rule']} {event['state']} on {event['stream']}: "
+            f"{event['metric']}={event['value']:.1f} (threshold {event['threshold']})"
+        )
+
+    def _post(self, url, event):
+        if not url:
+            raise ValueError("No webhook URL configured")
+        request = urllib.request.Request(
+            url,
+            data=json.dumps(event).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=5.0) as response:
+            response.read()
+
+
+class AlertEngine:
+    def __init__(self, alerts_config, dispatcher=None):
+        """Compile alert rules into arrays evaluated once per tick.
+
+        Each rule compares one metric against a threshold (``threshold`` for
+        upper bounds, ``min_threshold`` for lower bounds). Optional keys:
+        ``metric``, ``for`` (seconds the breach must last), ``hysteresis``
+        (distance back past the threshold before resolving), ``cooldown``
+        (minimum seconds between notifications), ``action`` and ``url``.
+        """
+        self.dispatcher = dispatcher or AlertDispatcher()
+        rules = [
+            (name, rule) for name, rule in (alerts_config or {}).items()
+            if isinstance(rule, dict) and rule.get('enabled', True)
+        ]
+
+        self.rule_names = [name for name, _ in rules]
+        self.rule_metrics = [rule.get('metric', RULE_METRICS.get(name, name)) for name, rule in rules]
+        self.metric_names = sorted(set(self.rule_metrics))
+        metric_index = {metric: i for i, metric in enumerate(self.metric_names)}
+
+        self.metric_idx = np.array([metric_index[m] for m in self.rule_metrics], dtype=np.int64)
+        self.is_upper = np.array(['min_threshold' not in rule for _, rule in rules], dtype=bool)
+        self.threshold = np.array(
+            [rule.get('threshold', rule.get('min_threshold', np.nan)) for _, rule in rules],
+            dtype=np.float64
+        )
+        hysteresis = np.array([rule.get('hysteresis', 0.0) for _, rule in rules], dtype=np.float64)
+        self.clear_threshold = np.where(self.is_upper, self.threshold - hysteresis, self.threshold + hysteresis)
+        self.for_duration = np.array([rule.get('for', 0.0) for _, rule in rules], dtype=np.float64)
+        self.cooldown = np.array([rule.get('cooldown', 300.0) for _, rule in rules], dtype=np.float64)
+        self.actions = [rule.get('action', 'log') for _, rule in rules]
+        self.urls = [rule.get('url') for _, rule in rules]
+
+        for name, action in zip(self.rule_names, self.actions):
+            if action not in ('log', 'webhook'):
+                logger.warning(f"Alert action '{action}' for {name} is not supported, using 'log'")
+        self.actions = [a if a in ('log', 'webhook') else 'log' for a in self.actions]
+
+        # Per-stream state, one row per stream
+        self.streams = {}
+        n_rules = len(rules)
+        self.pending_since = np.empty((0, n_rules))
+        self.firing = np.empty((0, n_rules), dtype=bool)
+        self.last_notified = np.empty((0, n_rules))
+        self.announced = np.empty((0, n_rules), dtype=bool)
+
+    def _stream_rows(self, stream_ids):
+        """Map stream ids to state rows, growing the state for new streams"""
+        new = [s for s in stream_ids if s not in self.streams]
+        if new:
+            for stream_id in new:
+                self.streams[stream_id] = len(self.streams)
+            n_rules = len(self.rule_names)
+            self.pending_since = np.vstack([self.pending_since, np.full((len(new), n_rules), np.nan)])
+            self.firing = np.vstack([self.firing, np.zeros((len(new), n_rules), dtype=bool)])
+            self.last_notified = np.vstack([self.last_notified, np.full((len(new), n_rules), -np.inf)])
+            self.announced = np.vstack([self.announced, np.zeros((len(new), n_rules), dtype=bool)])
+        return np.array([self.streams[s] for s in stream_ids], dtype=np.int64)
+
+    def evaluate(self, samples, now=None):
+        """Evaluate all rules against ``{stream_id: stats}`` or a single stats dict.
+
+        Returns the alert events emitted on this tick.
+        """
+        if not self.rule_names:
+            return []
+        if not samples or not isinstance(next(iter(samples.values())), dict):
+            samples = {'default': samples}
+        now = time.time() if now is None else now
+
+        stream_ids = list(samples)
+        rows = self._stream_rows(stream_ids)
+        metrics = np.array(
+            [[_metric_value(samples[s], m) for m in self.metric_names] for s in stream_ids],
+            dtype=np.float64
+        )
+        values = metrics[:, self.metric_idx]
+
+        with np.errstate(invalid='ignore'):
+            breach = np.where(self.is_upper, values > self.threshold, values < self.threshold)
+            cleared = np.where(self.is_upper, values < self.clear_threshold, values > self.clear_threshold)
+
+        pending = self.pending_since[rows]
+        firing = self.firing[rows]
+
+        pending = np.where(breach & np.isnan(pending), now, pending)
+        fire = breach & ~firing & (now - pending >= self.for_duration)
+        resolve = firing & cleared
+        firing = (firing | fire) & ~resolve
+        pending = np.where(breach | firing, pending, np.nan)
+
+        # Deduplicate: only state transitions notify, and firing is rate limited per rule
+        last = self.last_notified[rows]
+        announced = self.announced[rows]
+        notify_fire = fire & (now - last >= self.cooldown)
+        notify_resolve = resolve & announced
+        last = np.where(notify_fire, now, last)
+        announced = (announced | notify_fire) & ~resolve
+
+        self.pending_since[rows] = pending
+        self.firing[rows] = firing
+        self.last_notified[rows] = last
+        self.announced[rows] = announced
+
+        events = []
+        for state, mask in (('firing', notify_fire), ('resolved', notify_resolve)):
+            for i, j in zip(*np.nonzero(mask)):
+                event = {
+                    'rule': self.rule_names[j],
+                    'stream': stream_ids[i],
+                    'state': state,
+                    'metric': self.rule_metrics[j],
+                    'value': float(values[i, j]),
+                    'threshold': float(self.threshold[j]),
+                    'timestamp': now,
+                    'action': self.actions[j],
+                    'url': self.urls[j],
+                }
+                events.append(event)
+                self.dispatcher.dispatch(event)
+        return events
+
+    def close(self):
+        self.dispatcher.close()
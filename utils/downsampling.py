@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# utils/downsampling.py
+
+import numpy as np
+
+
+def _largest_triangle(prev_x, prev_y, bx, by, avg_x, avg_y):
+    """Index of the bucket point forming the largest triangle with its neighbours"""
+    area = np.abs((prev_x - avg_x) * (by - prev_y) - (prev_x - bx) * (avg_y - prev_y))
+    return int(np.argmax(area))
+
+
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last point and, for every bucket in between, the point
+    forming the largest triangle with the previously selected point and the
+    mean of the next bucket. Returns the selected indices.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        prev = start + _largest_triangle(x[prev], y[prev], x[start:end], y[start:end], avg_x, avg_y)
+        selected[i + 1] = prev
+
+    return selected
+
+
+def minmax_buckets(y, n_out):
+    """Min/max bucket downsampling.
+
+    Keeps the first and last point and splits everything in between into
+    ``(n_out - 2) // 2`` buckets, keeping the minimum and maximum of each, so
+    spikes survive. Every sample belongs to a bucket. Returns the selected
+    indices in order.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    n_buckets = max(1, (n_out - 2) // 2)
+    edges = np.linspace(1, n - 1, n_buckets + 1).astype(np.int64)
+    selected = [0, n - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        bucket = y[start:end]
+        if end <= start or np.isnan(bucket).all():
+            continue
+        hi = start + int(np.nanargmax(bucket))
+        if n_out < 4:
+            # Room for a single point: keep the one furthest from the endpoints
+            lo = start + int(np.nanargmin(bucket))
+            mid = (y[0] + y[-1]) / 2
+            selected.append(hi if abs(y[hi] - mid) >= abs(y[lo] - mid) else lo)
+            continue
+        selected.extend([start + int(np.nanargmin(bucket)), hi])
+
+    return np.unique(selected)
+
+
+def downsample(x, y, n_out, method='lttb'):
+    """Downsample a series to at most ``n_out`` points, returning (x, y)"""
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    valid = ~np.isnan(y)
+    x, y = x[valid], y[valid]
+
+    if method == 'minmax':
+        idx = minmax_buckets(y, n_out)
+    else:
+        idx = lttb(x.astype(np.float64), y, n_out)
+    return x[idx], y[idx]
+
+
+class TimeBucketDownsampler:
+    def __init__(self, bucket_seconds, method='lttb'):
+        """Incremental downsampling into buckets aligned to wall-clock time.
+
+        A bucket is finalized once it can no longer change: for ``minmax``
+        when a newer bucket has started, for ``lttb`` when the following
+        bucket is finished too, since it supplies the average point.
+        Finalized points are cached and never recomputed, so a client only
+        needs the buckets it has not seen plus the raw live tail.
+        """
+        self.bucket_seconds = bucket_seconds
+        self.method = method
+        self.points = {}  # bucket id -> (t, y) of the selected points
+        self.last_bucket = None
+        self._prev = None  # last selected point, the anchor for lttb
+
+    @property
+    def points_per_bucket(self):
+        return 2 if self.method == 'minmax' else 1
+
+    def update(self, t, y):
+        """Finalize what the window ``t``, ``y`` (sorted, NaN-free) allows.
+
+        Returns ``(bucket_ids, t, y)`` of every finalized point in the window
+        and the ``(t, y)`` live tail: the last finalized point followed by the
+        raw samples of the buckets still open.
+        """
+        t = np.asarray(t, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if len(t) == 0:
+            self.points.clear()
+            return (np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)), (np.empty(0), np.empty(0))
+
+        ids = np.floor(t / self.bucket_seconds).astype(np.int64)
+        bucket_ids, starts = np.unique(ids, return_index=True)
+        ends = np.append(starts[1:], len(t))
+        # The newest bucket is still filling; lttb also waits for its successor
+        limit = len(bucket_ids) - (2 if self.method == 'lttb' else 1)
+
+        for i in range(max(0, limit)):
+            bucket = int(bucket_ids[i])
+            if self.last_bucket is not None and bucket <= self.last_bucket:
+                continue
+            bt, by = t[starts[i]:ends[i]], y[starts[i]:ends[i]]
+            if self.method == 'minmax':
+                idx = np.unique([int(np.argmin(by)), int(np.argmax(by))])
+            else:
+                nt, ny = t[starts[i + 1]:ends[i + 1]], y[starts[i + 1]:ends[i + 1]]
+                prev_t, prev_y = self._prev if self._prev is not None else (bt[0], by[0])
+                idx = [_largest_triangle(prev_t, prev_y, bt, by, nt.mean(), ny.mean())]
+            self.points[bucket] = (bt[idx], by[idx])
+            self._prev = (bt[idx][-1], by[idx][-1])
+            self.last_bucket = bucket
+
+        # Forget buckets that left the window
+        for bucket in [b for b in self.points if b < bucket_ids[0]]:
+            del self.points[bucket]
+
+        ordered = sorted(self.points)
+        history = (
+            np.array([b for b in ordered for _ in self.points[b][0]], dtype=np.int64),
+            np.concatenate([self.points[b][0] for b in ordered]) if ordered else np.empty(0),
+            np.concatenate([self.points[b][1] for b in ordered]) if ordered else np.empty(0),
+        )
+
+        open_from = np.searchsorted(ids, self.last_bucket, side='right') if self.last_bucket is not None else 0
+        live_t, live_y = t[open_from:], y[open_from:]
+        if ordered:
+            live_t = np.append(history[1][-1], live_t)
+            live_y = np.append(history[2][-1], live_y)
+        return history, (live_t, live_y)
@@ -2,5 +2,17 @@
 
 from .performance import PerformanceMonitor
 from .visualization import create_plot, create_dashboard_layout
+from .downsampling import lttb, minmax_buckets, downsample, TimeBucketDownsampler
+from .metrics_stream import MetricsPublisher, MetricsSubscriber
+from .metrics_exporter import MetricsExporter, render_openmetrics
+from .alerts import AlertEngine, AlertDispatcher
+from .tracing import FrameTracer
 
-__all__ = ['PerformanceMonitor', 'create_plot', 'create_dashboard_layout']
\ No newline at end of file
+__all__ = [
+    'PerformanceMonitor', 'create_plot', 'create_dashboard_layout',
+    'lttb', 'minmax_buckets', 'downsample', 'TimeBucketDownsampler',
+    'MetricsPublisher', 'MetricsSubscriber',
+    'MetricsExporter', 'render_openmetrics',
+    'AlertEngine', 'AlertDispatcher',
+    'FrameTracer'
+]
\ No newline at end of file
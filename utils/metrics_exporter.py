@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# utils/metrics_exporter.py
+
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .performance import LATENCY_BUCKETS
+
+logger = logging.getLogger('YOLOv8-Exporter')
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+PREFIX = 'edge_ai'
+
+# stats key -> (metric name, help text)
+GAUGES = {
+    'fps': ('fps', 'Frames processed per second'),
+    'gpu_load': ('gpu_utilization_percent', 'GPU utilization'),
+    'gpu_memory_used': ('gpu_memory_used_megabytes', 'GPU memory in use'),
+    'gpu_memory_total': ('gpu_memory_total_megabytes', 'Total GPU memory'),
+    'gpu_temperature': ('gpu_temperature_celsius', 'GPU temperature'),
+    'cpu_percent': ('cpu_utilization_percent', 'CPU utilization'),
+    'memory_percent': ('memory_utilization_percent', 'System memory utilization'),
+    'memory_available': ('memory_available_megabytes', 'Available system memory'),
+}
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+def render_openmetrics(snapshot, stats):
+    """Render a PerformanceMonitor snapshot and stats in OpenMetrics text format"""
+    lines = []
+
+    for key, (name, help_text) in GAUGES.items():
+        if stats.get(key) is None:
+            continue
+        lines.append(f'# TYPE {PREFIX}_{name} gauge')
+        lines.append(f'# HELP {PREFIX}_{name} {help_text}.')
+        lines.append(f'{PREFIX}_{name} {_format_value(stats[key])}')
+
+    lines.append(f'# TYPE {PREFIX}_frames counter')
+    lines.append(f'# HELP {PREFIX}_frames Frames processed.')
+    lines.append(f'{PREFIX}_frames_total {snapshot.get("frames_total", 0)}')
+
+    lines.append(f'# TYPE {PREFIX}_dropped_frames counter')
+    lines.append(f'# HELP {PREFIX}_dropped_frames Frames dropped because a queue was full.')
+    lines.append(f'{PREFIX}_dropped_frames_total {snapshot.get("dropped_frames", 0)}')
+
+    queue_depths = snapshot.get('queue_depths', {})
+    if queue_depths:
+        lines.append(f'# TYPE {PREFIX}_queue_depth gauge')
+        lines.append(f'# HELP {PREFIX}_queue_depth Items waiting in a processing queue.')
+        for queue_name, depth in sorted(queue_depths.items()):
+            lines.append(f'{PREFIX}_queue_depth{{queue="{queue_name}"}} {depth}')
+
+    histograms = snapshot.get('stage_histograms', {})
+    if histograms:
+        name = f'{PREFIX}_stage_latency_seconds'
+        lines.append(f'# TYPE {name} histogram')
+        lines.append(f'# UNIT {name} seconds')
+        lines.append(f'# HELP {name} Latency of each pipeline stage.')
+        bounds = list(LATENCY_BUCKETS) + [float('inf')]
+        for stage, histogram in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, histogram['buckets']):
+                cumulative += count
+                lines.append(
+                    f'{name}_bucket{{stage="{stage}",le="{_format_value(bound)}"}} {cumulative}'
+                )
+            lines.append(f'{name}_count{{stage="{stage}"}} {histogram["count"]}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {_format_value(histogram["sum"])}')
+
+    lines.append('# EOF')
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+class MetricsExporter:
+    def __init__(self, host='0.0.0.0', port=9108):
+        """Serve a pre-rendered OpenMetrics payload over HTTP.
+
+        The payload is rebuilt by ``update`` on the monitoring thread, so a
+        scrape only copies bytes and never touches the detection pipeline.
+        """
+        self.host = host
+        self.port = port
+        self._payload = b'# EOF\n'
+        self._server = None
+        self._thread = None
+
+    def update(self, snapshot, stats):
+        """Render a new payload for subsequent scrapes"""
+        self._payload = render_openmetrics(snapshot, stats)
+
+    def start(self):
+        """Start the HTTP server on a background thread"""
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                payload = exporter._payload
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Metrics exporter listening on http://{self.host}:{self.server_port}/metrics")
+
+    @property
+    def server_port(self):
+        return self._server.server_address[1] if self._server else self.port
+
+    def stop(self):
+        """Stop the HTTP server"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
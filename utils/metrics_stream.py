@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# utils/metrics_stream.py
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+import websockets
+
+logger = logging.getLogger('YOLOv8-MetricsStream')
+
+DROP_POLICIES = ('drop_oldest', 'drop_newest', 'disconnect')
+
+
+def _encode(frame):
+    """Compact JSON encoding for a list of [timestamp, delta] entries"""
+    return json.dumps(frame, separators=(',', ':'))
+
+
+def _compact(value):
+    """Round floats so deltas stay small on the wire"""
+    if isinstance(value, float):
+        return round(value, 3)
+    return value
+
+
+class _ClientQueue:
+    """Bounded per-client message queue living on the publisher loop"""
+
+    def __init__(self, maxsize, drop_policy):
+        self.maxsize = maxsize
+        self.drop_policy = drop_policy
+        self.messages = deque()
+        self.event = asyncio.Event()
+        self.resync = False
+        self.closed = False
+        self.dropped = 0
+
+    def offer(self, message):
+        if len(self.messages) >= self.maxsize:
+            self.dropped += 1
+            if self.drop_policy == 'disconnect':
+                self.closed = True
+            elif self.drop_policy == 'drop_newest':
+                self.resync = True
+                return
+            else:
+                self.messages.popleft()
+                self.resync = True
+        self.messages.append(message)
+        self.event.set()
+
+    async def drain(self):
+        """Wait for messages and return everything queued so far"""
+        await self.event.wait()
+        self.event.clear()
+        batch = list(self.messages)
+        self.messages.clear()
+        return batch
+
+
+class MetricsPublisher:
+    def __init__(self, host='0.0.0.0', port=8765, client_queue_size=32,
+                 drop_policy='drop_oldest'):
+        """Publish metric deltas to any number of WebSocket clients.
+
+        Each client gets a bounded queue; when a slow client overflows it, the
+        configured drop policy applies and the client is resynced with a full
+        snapshot on its next frame.
+        """
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+
+        self.host = host
+        self.port = port
+        self.client_queue_size = client_queue_size
+        self.drop_policy = drop_policy
+
+        self._state = {}
+        self._state_time = None
+        self._state_lock = threading.Lock()
+        self._clients = set()
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        """Start the WebSocket server on a background thread"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5.0)
+        logger.info(f"Metrics stream listening on ws://{self.host}:{self.server_port}")
+
+    def stop(self):
+        """Stop the server and disconnect all clients"""
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._close_clients)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5.0)
+        self._loop = None
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._server = self._loop.run_until_complete(self._serve())
+            self._ready.set()
+            self._loop.run_forever()
+        except Exception as e:
+            logger.error(f"Error in metrics stream server: {e}")
+        finally:
+            if self._server is not None:
+                self._server.close()
+                self._loop.run_until_complete(self._server.wait_closed())
+            self._loop.close()
+            self._ready.set()
+
+    async def _serve(self):
+        return await websockets.serve(self._handler, self.host, self.port)
+
+    def publish(self, stats, timestamp=None):
+        """Publish the keys of ``stats`` that changed since the last call.
+
+        A tick where nothing changed still sends its timestamp, so
+        subscribers get one sample per tick.
+        """
+        timestamp = timestamp or time.time()
+        with self._state_lock:
+            delta = {
+                key: _compact(value) for key, value in stats.items()
+                if self._state.get(key) != _compact(value)
+            }
+            self._state.update(delta)
+            self._state_time = timestamp
+
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._fan_out, [round(timestamp, 3), delta])
+
+    @property
+    def server_port(self):
+        """Port actually bound, useful when started with port 0"""
+        if self._server is None or not self._server.sockets:
+            return self.port
+        return list(self._server.sockets)[0].getsockname()[1]
+
+    def _close_clients(self):
+        """Wake every client handler so it exits before the server closes"""
+        for client in self._clients:
+            client.closed = True
+            client.event.set()
+
+    def _fan_out(self, message):
+        for client in self._clients:
+            client.offer(message)
+
+    def _snapshot(self):
+        with self._state_lock:
+            return [round(self._state_time or time.time(), 3), dict(self._state)]
+
+    async def _handler(self, websocket, path=None):
+        client = _ClientQueue(self.client_queue_size, self.drop_policy)
+        self._clients.add(client)
+        try:
+            # New clients start from a full snapshot
+            if self._state:
+                await websocket.send(_encode([self._snapshot()]))
+
+            while not client.closed:
+                batch = await client.drain()
+                if client.closed:
+                    break
+                if client.resync:
+                    client.resync = False
+                    batch = [self._snapshot()]
+                # Coalesce everything queued into a single frame
+                await websocket.send(_encode(batch))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self._clients.discard(client)
+            if client.dropped:
+                logger.warning(f"Metrics client dropped {client.dropped} messages")
+
+
+class MetricsSubscriber:
+    def __init__(self, url, on_sample, reconnect_delay=1.0):
+        """Subscribe to a MetricsPublisher and rebuild the full metrics state.
+
+        ``on_sample(timestamp, metrics)`` is called from the subscriber thread
+        for every entry received.
+        """
+        self.url = url
+        self.on_sample = on_sample
+        self.reconnect_delay = reconnect_delay
+        self.connected = False
+        self._state = {}
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Start receiving metrics on a background thread"""
+        self._running = True
+        self._thread = threading.Thread(
+            target=lambda: asyncio.run(self._receive_loop()), daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+    async def _receive_loop(self):
+        while self._running:
+            try:
+                async with websockets.connect(self.url) as websocket:
+                    self.connected = True
+                    logger.info(f"Subscribed to metrics stream {self.url}")
+                    async for frame in websocket:
+                        if not self._running:
+                            break
+                        for timestamp, delta in json.loads(frame):
+                            self._state.update(delta)
+                            self.on_sample(timestamp, dict(self._state))
+            except Exception as e:
+                log = logger.warning if self.connected else logger.debug
+                log(f"Metrics stream unavailable: {e}")
+            finally:
+                self.connected = False
+            await asyncio.sleep(self.reconnect_delay)
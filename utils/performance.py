@@ -2,6 +2,8 @@
 # utils/performance.py
 
 import time
+import bisect
+import threading
 from collections import deque
 import numpy as np
 import psutil
@@ -11,6 +13,9 @@ import logging
 
 logger = logging.getLogger('YOLOv8-Performance')
 
+# Upper bounds (seconds) of the per-stage latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 1.0, 2.5)
+
 class PerformanceMonitor:
     def __init__(self, buffer_size=30):
         """Initialize performance monitoring"""
@@ -20,20 +25,60 @@ class PerformanceMonitor:
         self.last_fps_update = time.time()
         self.frames_processed = 0
 
+        # Cumulative counters for metrics exposition
+        self._lock = threading.Lock()
+        self.frames_total = 0
+        self.dropped_frames = 0
+        self.queue_depths = {}
+        self.stage_histograms = {}
+
     @contextmanager
-    def measure_processing_time(self):
-        """Context manager to measure processing time"""
+    def measure_processing_time(self, frames=1):
+        """Context manager to measure processing time of one or more frames"""
         start_time = time.perf_counter()
         try:
             yield
         finally:
             process_time = time.perf_counter() - start_time
-            self.processing_times.append(process_time)
-            self._update_fps()
+            self.processing_times.append(process_time / frames)
+            self.observe_stage('processing', process_time)
+            self._update_fps(frames)
+
+    @contextmanager
+    def measure_stage(self, stage):
+        """Context manager to measure the latency of one pipeline stage"""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, time.perf_counter() - start_time)
 
-    def _update_fps(self):
+    def observe_stage(self, stage, seconds):
+        """Record a stage latency into its histogram"""
+        with self._lock:
+            histogram = self.stage_histograms.get(stage)
+            if histogram is None:
+                histogram = {'buckets': [0] * (len(LATENCY_BUCKETS) + 1), 'sum': 0.0, 'count': 0}
+                self.stage_histograms[stage] = histogram
+            histogram['buckets'][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+
+    def record_drop(self, count=1):
+        """Count frames dropped because the pipeline could not keep up"""
+        with self._lock:
+            self.dropped_frames += count
+
+    def set_queue_depth(self, queue_name, depth):
+        """Record the current depth of a processing queue"""
+        with self._lock:
+            self.queue_depths[queue_name] = depth
+
+    def _update_fps(self, frames=1):
         """Update FPS calculation"""
-        self.frames_processed += 1
+        self.frames_processed += frames
+        with self._lock:
+            self.frames_total += frames
         current_time = time.time()
         time_diff = current_time - self.last_fps_update
 
@@ -71,8 +116,12 @@ class PerformanceMonitor:
             logger.error(f"Error getting system stats: {e}")
         return {}
 
-    def get_stats(self):
-        """Get comprehensive performance statistics"""
+    def get_stats(self, include_system=True):
+        """Get comprehensive performance statistics
+
+        GPU and system stats query nvidia-smi and psutil; pass
+        ``include_system=False`` on hot paths such as the display overlay.
+        """
         stats = {
             'fps': np.mean(self.fps_buffer) if self.fps_buffer else 0,
             'processing_time': np.mean(self.processing_times) if self.processing_times else 0,
@@ -80,11 +129,29 @@ class PerformanceMonitor:
         }
         
         # Add GPU and system stats
-        stats.update(self.get_gpu_stats())
-        stats.update(self.get_system_stats())
+        if include_system:
+            stats.update(self.get_gpu_stats())
+            stats.update(self.get_system_stats())
         
         return stats
 
+    def get_snapshot(self):
+        """Copy the cumulative counters, queue depths and stage histograms"""
+        with self._lock:
+            return {
+                'frames_total': self.frames_total,
+                'dropped_frames': self.dropped_frames,
+                'queue_depths': dict(self.queue_depths),
+                'stage_histograms': {
+                    stage: {
+                        'buckets': list(histogram['buckets']),
+                        'sum': histogram['sum'],
+                        'count': histogram['count']
+                    }
+                    for stage, histogram in self.stage_histograms.items()
+                }
+            }
+
     def log_performance(self):
         """Log current performance metrics"""
         stats = self.get_stats()
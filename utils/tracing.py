@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# utils/tracing.py
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+import logging
+
+logger = logging.getLogger('YOLOv8-Tracing')
+
+
+class _NullSpan:
+    """Span returned for frames that are not sampled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'frame_id', 'stream_id', 'start_ns')
+
+    def __init__(self, tracer, name, frame_id, stream_id):
+        self.tracer = tracer
+        self.name = name
+        self.frame_id = frame_id
+        self.stream_id = stream_id
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.add_span(
+            self.name, self.frame_id, self.stream_id,
+            self.start_ns, time.perf_counter_ns()
+        )
+        return False
+
+
+class FrameTracer:
+    def __init__(self, enabled=False, sample_every=1, capacity=65536):
+        """Record per-frame pipeline spans into a bounded ring buffer.
+
+        Only frames whose id is a multiple of ``sample_every`` are traced;
+        other frames get a shared no-op span.
+        """
+        self.enabled = enabled
+        self.sample_every = max(1, int(sample_every))
+        self._spans = deque(maxlen=capacity)
+
+    def sampled(self, frame_id):
+        """Whether spans of this frame are recorded"""
+        return self.enabled and frame_id % self.sample_every == 0
+
+    def span(self, name, frame_id, stream_id=0):
+        """Context manager timing one stage of a frame"""
+        if not self.sampled(frame_id):
+            return NULL_SPAN
+        return _Span(self, name, frame_id, stream_id)
+
+    def add_span(self, name, frame_id, stream_id, start_ns, end_ns):
+        """Record a span measured by the caller, e.g. across threads"""
+        if not self.sampled(frame_id):
+            return
+        self._spans.append(
+            (name, frame_id, stream_id, start_ns, end_ns - start_ns, threading.get_ident())
+        )
+
+    def spans(self):
+        """Copy of the recorded spans as
+        ``(name, frame_id, stream_id, start_ns, duration_ns, thread_id)``"""
+        return list(self._spans)
+
+    def clear(self):
+        self._spans.clear()
+
+    def to_chrome_trace(self, spans=None):
+        """Build a Chrome trace event document (viewable in Perfetto).
+
+        Workers keep appending while this runs, so everything is built from
+        one snapshot; pass ``spans`` to reuse a snapshot taken by the caller.
+        """
+        spans = self.spans() if spans is None else spans
+        events = []
+        for stream_id in sorted({span[2] for span in spans}, key=str):
+            events.append({
+                'name': 'process_name', 'ph': 'M', 'pid': stream_id,
+                'args': {'name': f'stream {stream_id}'}
+            })
+
+        for name, frame_id, stream_id, start_ns, duration_ns, thread_id in spans:
+            events.append({
+                'name': name,
+                'cat': 'pipeline',
+                'ph': 'X',
+                'ts': start_ns / 1000.0,
+                'dur': duration_ns / 1000.0,
+                'pid': stream_id,
+                'tid': thread_id,
+                'args': {'frame': frame_id, 'stream': stream_id}
+            })
+
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'pid': os.getpid(), 'sample_every': self.sample_every}
+        }
+
+    def export_chrome_trace(self, path):
+        """Write the recorded spans to ``path`` as Chrome trace JSON"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        spans = self.spans()
+        with open(path, 'w') as f:
+            json.dump(self.to_chrome_trace(spans), f)
+        logger.info(f"Trace with {len(spans)} spans written to {path}")
+        return path